@@ -0,0 +1,103 @@
+import threading, time
+
+'''
+AutoSaver coalesces bursts of saves into one write.
+
+Every schedule() replaces the pending save with the latest one. The pending
+save is written once no new save has come in for the quiet period, or
+straight away once `every` saves have piled up. Writes happen one at a time
+on a single background thread, so they never overlap.
+'''
+
+
+class AutoSaver:
+
+    def __init__(self, write, quiet=1.0, every=25):
+        '''
+        :param write: Function that does the writing, called with the arguments of schedule()
+        :param quiet: Seconds without a new save before writing
+        :param every: Number of saves after which to write regardless
+        '''
+        self.write = write
+        self.quiet = quiet
+        self.every = every
+        self.writes = 0
+
+        self.__cond = threading.Condition()
+        self.__pending = None
+        self.__count = 0
+        self.__due = 0
+        self.__writing = False
+        self.__closed = False
+
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def schedule(self, *args):
+        '''
+        Asks for a save. Only the latest of a burst is written.
+        :param args: Arguments for the write function
+        '''
+        with self.__cond:
+            self.__pending = args
+            self.__count += 1
+            self.__due = time.monotonic() + self.quiet
+            if self.__count >= self.every:
+                self.__due = 0
+            self.__cond.notify_all()
+
+    def flush(self):
+        '''
+        Writes the pending save now, and waits until nothing is being written.
+        '''
+        with self.__cond:
+            self.__due = 0
+            self.__cond.notify_all()
+            while self.__pending is not None or self.__writing:
+                self.__cond.wait()
+
+    def cancel(self):
+        '''
+        Drops the pending save, and waits until nothing is being written.
+        Use before removing the savefile, so a late write can't bring it back.
+        '''
+        with self.__cond:
+            self.__pending = None
+            self.__count = 0
+            while self.__writing:
+                self.__cond.wait()
+
+    def close(self):
+        # Writes what's pending and stops the background thread.
+        self.flush()
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify_all()
+        self.__thread.join()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while not self.__closed:
+                    if self.__pending is not None:
+                        wait = self.__due - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self.__cond.wait(wait)
+                    else:
+                        self.__cond.wait()
+                if self.__closed:
+                    return
+                args = self.__pending
+                self.__pending = None
+                self.__count = 0
+                self.__writing = True
+            try:
+                self.write(*args)
+                self.writes += 1
+            except Exception as e:
+                print(f"Unable to write save: {e}")
+            finally:
+                with self.__cond:
+                    self.__writing = False
+                    self.__cond.notify_all()
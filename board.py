@@ -1,25 +1,148 @@
-from field import Field
-import random
+from field import PackedFields
+from planes import FieldPlanes, MappedPlanes
+from topology import TOPOLOGIES, GraphView
+from floodfill import scanline_fill, frontier_fill
+from openings import OpeningIndex
+import random, struct, base64, binascii, threading
 
 '''
 The Board is basically a Graph with extra information.
 Fields are vertices.
 
 - self.fields is a key:value store of vertices (locs) and their fields.
-- self.graph is a key:value store of vertices and edges (legal moves)
+- self.graph is a key:value view of vertices and edges (legal moves)
+- self.topology works out the edges of a vertex from its loc
 
 get_field(loc) to get a relevant field for a location.
 
+The engine picks how self.fields is stored:
+- "fields": a PackedFields store of Fields, one state byte each (default)
+- "array": a FieldPlanes store of contiguous byte planes, for big boards
+- "mmap": the same planes in a memory-mapped file at path, for huge boards
+
+With deferred=True the mines are only laid on the first reveal, away from
+the revealed field and its neighbours, so the first click is always safe and
+creating a board costs nothing.
+
+Mines are laid by a Random seeded with self.seed, so the seed rebuilds the
+board. board_id packs the mode, difficulty or size, seed and, for deferred
+boards, the first click into a short code that Board.from_id builds the same
+board from.
+
+With openings=True, self.openings indexes every opening (a region of 0s and
+its numbered border) each time the mines are counted, so revealing a 0 is a
+single lookup.
+
 '''
 
+# Settings for each difficulty level
+SETTINGS = {
+    # (squares-x, squares-y, number of bombs)
+      "test": (4, 4, 0)
+    , "beginner": (8, 10, 10)
+    , "intermediate": (13, 16, 40)
+    , "expert": (16, 30, 9)
+}
+
+MODES = ("classic", "hexagon")
+DIFFICULTIES = ("test", "beginner", "intermediate", "expert", "custom")
+
+# Board IDs are base32 of: a flags byte (bit 0 mode, bit 1 deferred, bit 2 has
+# a first click, bits 3-5 difficulty) and the seed, then the size of custom
+# boards, then the first click
+ID = struct.Struct("<BI")
+ID_CUSTOM = struct.Struct("<HHI")
+ID_FIRST = struct.Struct("<HH")
+
+# Held while a deferred board lays its mines, so two first reveals on
+# different threads can't both lay them
+_laying = threading.Lock()
+
+
+def parse_id(board_id):
+    '''
+    Unpacks a board ID
+    :param board_id: ID from Board.board_id
+    :return: (mode, difficulty, seed, deferred, first) where difficulty is a
+             name or (squares-x, squares-y, number of bombs), and first is the
+             loc of the first click or None
+    '''
+    try:
+        data = base64.b32decode(board_id.upper() + "=" * (-len(board_id) % 8))
+        flags, seed = ID.unpack_from(data)
+        offset = ID.size
+        difficulty = DIFFICULTIES[flags >> 3]
+        if difficulty == "custom":
+            difficulty = ID_CUSTOM.unpack_from(data, offset)
+            offset += ID_CUSTOM.size
+        first = ID_FIRST.unpack_from(data, offset) if flags & 4 else None
+        mode = MODES[flags & 1]
+    except (binascii.Error, struct.error, IndexError):
+        raise ValueError(f"Not a board ID: {board_id}")
+
+    # Guard: The first click must be on the board
+    r, c = (difficulty if isinstance(difficulty, tuple) else SETTINGS[difficulty])[:2]
+    if first is not None and not (first[0] < r and first[1] < c):
+        raise ValueError(f"Not a board ID: {board_id}")
+    return mode, difficulty, seed, bool(flags & 2), first
+
+
 class Board:
 
-    def __init__(self, difficulty="beginner", mode="classic"):
-        # Sides is the amount of edges each vertex has.
+    # Boards pickled before engines existed always used Field objects
+    engine = "fields"
+    track_openings = False
+    openings = None
+    mines_laid = True
+    seed = None
+    deferred = False
+    first = None
+
+    def __init__(self, difficulty="beginner", mode="classic", engine="fields", openings=False, path=None, deferred=False, seed=None):
+        # Gets settings for chosen difficulty level
+        if isinstance(difficulty, tuple):
+            # Custom boards are passed as (squares-x, squares-y, number of bombs)
+            r, c, total = difficulty
+            difficulty = "custom"
+        else:
+            r, c, total = SETTINGS[difficulty]
+        self.__setup(difficulty, mode, r, c, total)
+
+        # Build k:v store of loc:field objects
+        self.engine = engine
+        # A 32-bit seed the mines are laid from, as board IDs only keep 32 bits
+        self.seed = random.getrandbits(32) if seed is None else seed & 0xffffffff
+        if engine == "array":
+            self.fields = FieldPlanes(self.r, self.c)
+        elif engine == "mmap":
+            # Guard: A default path would quietly replace a file
+            if path is None:
+                raise ValueError("Boards with engine='mmap' need a path")
+            self.fields = MappedPlanes(self.r, self.c, path, mode, self.difficulty, total, self.seed, deferred)
+        else:
+            self.fields = PackedFields(self.r, self.c)
+
+        self.track_openings = openings
+        self.deferred = deferred
+        self.mines_laid = not deferred
+        if deferred:
+            # Mines are laid on the first reveal
+            return
+        # Lay the number of mines from the difficulty settings
+        self.lay_mines(self.__total_mines, self.seed)
+        self.count_mines()
 
+    def __setup(self, difficulty, mode, r, c, total):
+        '''
+        Sets up the shape of the board, shared by every way of making one
+        :param difficulty: Name of the difficulty, or "custom"
+        :param r, c: Size of the board
+        :param total: Number of mines
+        '''
         self.difficulty = difficulty
         self.mode = mode
 
+        # Sides is the amount of edges each vertex has.
         sides = {
             "classic": 4,
             "hexagon": 6
@@ -27,34 +150,113 @@ class Board:
         # Edges are the number of sides
         self.edges = sides[mode]
 
-        # Gets settings for chosen difficulty level
-        settings = {
-            # (squares-x, squares-y, number of bombs)
-              "test": (4, 4, 0)
-            , "beginner": (8, 10, 10)
-            , "intermediate": (13, 16, 40)
-            , "expert": (16, 30, 9)
-        }
-        settings = settings[difficulty]
-
-        # Create the Board of Fields
-        self.r = settings[0]
-        self.c = settings[1]
-        self.__total_mines = settings[2]
-
-        # Build k:v store of loc:field objects
-        self.fields = {}
-        for row in range(self.r):
-            for col in range(self.c):
-                self.fields[(row, col)] = Field()
+        self.r = r
+        self.c = c
+        self.__total_mines = total
+
+        # Edges are worked out on demand by the topology, and self.graph
+        # gives the k:v view of vertex:edges (loc, legal moves)
+        self.topology = TOPOLOGIES[mode](self.r, self.c)
+        self.graph = GraphView(self.topology)
+
+    def __setstate__(self, state):
+        # Boards pickled before topologies existed carry a full graph dict
+        self.__dict__.update(state)
+        if "topology" not in state:
+            self.topology = TOPOLOGIES[self.mode](self.r, self.c)
+            self.graph = GraphView(self.topology)
+        # and a dict of Field objects
+        if isinstance(self.fields, dict):
+            fields = PackedFields(self.r, self.c)
+            for (row, col), field in self.fields.items():
+                fields.states[row * self.c + col] = field.state
+            self.fields = fields
+
+    @classmethod
+    def from_planes(cls, difficulty, mode, r, c, mines, revealed, flagged, engine="fields", board_id=None):
+        '''
+        Rebuilds a board from its planes, as saved by save_state
+        :param difficulty: Name of the difficulty, or "custom"
+        :param r, c: Size of the board
+        :param mines, revealed, flagged: Planes of r * c bytes, 1 for set
+        :param board_id: ID the board was made from, if it has one
+        :return: Board
+        '''
+        board = cls((r, c, 0), mode, engine)
+        board.difficulty = difficulty
+        # The planes can't say what seed, if any, they came from
+        board.seed = None
+        board.__total_mines = r * c - bytes(mines).count(0)
+        board.fields.set_planes(mines, revealed, flagged)
+        if board_id:
+            id_difficulty, board.seed, board.deferred, board.first = parse_id(board_id)[1:]
+            board.mines_laid = not board.deferred or board.first is not None
+            if not board.mines_laid:
+                # No mines in the planes yet, the ID knows how many are coming
+                board.__total_mines = (id_difficulty if isinstance(id_difficulty, tuple) else SETTINGS[id_difficulty])[2]
+        board.count_mines()
+        return board
 
-        # Buid k:v store of vertex:edges (loc, legal moves)
-        self.graph = self.__build_graph_dictionary()
+    @classmethod
+    def from_id(cls, board_id, engine="fields"):
+        '''
+        Builds the board a board ID was made from
+        :param board_id: ID from Board.board_id
+        :return: Board, with nothing revealed
+        '''
+        mode, difficulty, seed, deferred, first = parse_id(board_id)
+        board = cls(difficulty, mode, engine, deferred=deferred, seed=seed)
+        if first is not None:
+            board.__lay_deferred(first)
+        return board
 
+    @property
+    def board_id(self):
+        '''
+        A short code that Board.from_id builds this board from
+        :return: str, or None if the board has no seed or is too big for an ID
+        '''
+        # Guard: Boards rebuilt from planes have no seed
+        if self.seed is None:
+            return None
+        # Guard: IDs keep each side in 16 bits, and the number of mines in 32
+        if self.r > 0xffff or self.c > 0xffff or self.__total_mines > 0xffffffff:
+            return None
+        first = self.first if self.deferred and self.mines_laid else None
+        flags = MODES.index(self.mode) | self.deferred << 1 | (first is not None) << 2
+        flags |= DIFFICULTIES.index(self.difficulty) << 3
+        data = ID.pack(flags, self.seed)
+        if self.difficulty == "custom":
+            data += ID_CUSTOM.pack(self.r, self.c, self.__total_mines)
+        if first is not None:
+            data += ID_FIRST.pack(*first)
+        return base64.b32encode(data).decode().rstrip("=")
+
+    @classmethod
+    def attach(cls, path, readonly=False):
+        '''
+        Opens a board kept in a memory-mapped file, without reading it in
+        :param path: File of a board created with engine="mmap"
+        :param readonly: Attach read-only, e.g. from a solver in another process
+        :return: Board
+        '''
+        fields = MappedPlanes.attach(path, readonly)
+        board = cls.__new__(cls)
+        board.__setup(fields.difficulty, fields.mode, fields.r, fields.c, fields.total)
+        board.engine = "mmap"
+        board.fields = fields
+        board.seed = fields.seed
+        board.deferred = fields.deferred
+        board.first = fields.first
+        board.mines_laid = not board.deferred or board.first is not None
+        return board
 
-        # Lay the number of mines from the difficulty settings
-        self.lay_mines(self.__total_mines)
-        self.count_mines()
+    def get_planes(self):
+        '''
+        The state of the board without the counts, which can be worked out again
+        :return: (mines, revealed, flagged) planes, r * c bytes each, 1 for set
+        '''
+        return self.fields.get_planes()
 
     def get_total_number_of_mines(self):
         return self.__total_mines
@@ -64,6 +266,9 @@ class Board:
         Returns the entire board state for the GUI
         :return:
         '''
+        if self.engine != "fields":
+            return self.fields.get_board()
+
         board = []
         for row in range(self.r):
             for col in range(self.c):
@@ -78,49 +283,6 @@ class Board:
         return board
 
 
-    def __build_graph_dictionary(self):
-        '''
-        Loops through each loc/field pair in self.fields
-        and builds a graph dictionary with vertices and edges
-        :return: Dictionary of vertexes and their edges
-        '''
-        # Get number of edges
-        edges = self.edges
-
-        # list of legal moves depends on how many edges a vertex has
-        legal_moves = {
-            4: [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)],
-            "6_even": [(-1, -1), (-1, 0), (0, 1), (1, 0), (1, -1), (0, -1)],
-            "6_odd": [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (0, -1)]
-        }
-
-        graph_dict = {}
-
-        # For each vertex
-        for vertex_r, vertex_c in self.fields:
-            # For each legal move
-
-            # Sort out which legal_moves list to grab
-            if self.edges is 6:
-                if vertex_r % 2:
-                    # Grab the odd list
-                    moves = "6_odd"
-                else:
-                    moves = "6_even"
-            elif self.edges is 4:
-                moves = 4
-
-            graph_dict[(vertex_r, vertex_c)] = []
-            for edge_r, edge_c in legal_moves[moves]:
-                # Add the new absolute location of another vertex
-                e = (vertex_r + edge_r, vertex_c + edge_c)
-                # Guard: Check that loc is not out of bounds
-                if not self.get_field(e):
-                    continue
-                # And add it to the list of edges for the original vertex
-                graph_dict[(vertex_r, vertex_c)].append(e)
-        return graph_dict
-
     def get_field(self, loc):
         '''
         Ensures that the Field exists
@@ -140,39 +302,149 @@ class Board:
         return self.get_field(loc).value
 
 
-    def lay_mines(self, qty):
+    def lay_mines(self, qty, seed=None, exclude=()):
         '''
         Lays the mines on the graph
-        :return:
+        Picks distinct free fields straight away rather than retrying random
+        locations, so dense boards cost no more than sparse ones.
+        :param qty: Number of mines to lay
+        :param seed: Optional seed, the same seed lays the same mines
+        :param exclude: locs that must not take a mine
+        :return: True if every mine was laid, False if there was no room
         '''
 
-        # Guard: Check that qty is above 0
-        if qty <= 1:
+        # Guard: Check that qty is not below 0, and that there is anything to lay
+        if qty < 0:
+            return False
+        if qty == 0:
+            return True
+
+        rng = random.Random(seed)
+
+        # Flat indices (row * c + col) of fields that can still take a mine
+        mines = self.fields.mines if self.engine != "fields" else self.fields.get_mines()
+        free = range(self.r * self.c)
+        if 1 in mines:
+            free = [i for i in free if not mines[i]]
+        if exclude:
+            skip = {row * self.c + col for row, col in exclude}
+            free = [i for i in free if i not in skip]
+
+        # Guard: There must be room for every mine
+        if qty > len(free):
             return False
 
-        # Lambda for generating a random location
-        def rand_loc(): return (random.randint(0, self.r - 1), random.randint(0, self.c - 1))
-
-        while qty is not 0:
-            # Get a random field
-            field = self.get_field(rand_loc())
+        if qty > len(free) // 2:
+            # Dense boards: pick the fields to leave clear instead
+            clear = set(rng.sample(free, len(free) - qty))
+            picks = [i for i in free if i not in clear]
+        else:
+            picks = rng.sample(free, qty)
 
-            # Try and lay a mine there
-            if not field.is_mined:
-                field.set_mine()
-                # If successful, reduce qty of mines to lay by one
-                qty-=1
+        if self.engine != "fields":
+            for i in picks:
+                mines[i] = 1
+        else:
+            self.fields.set_mines(picks)
+        return True
 
     def count_mines(self):
         '''
         Counts the mines on the board, and sets vertexes
+        All vertices are counted at once from a plane of mines.
         :return:
         '''
-        for vertex in self.graph:
-            edges = self.graph[vertex]
-            for e in edges:
-                if self.get_field(e).is_mined:
-                    self.get_field(vertex).increment()
+        count = self.topology.count
+
+        if self.engine != "fields":
+            mines = self.fields.mines
+            counts = self.fields.counts
+            counts[:] = count(mines)
+        else:
+            mines = self.fields.get_mines()
+            counts = count(mines)
+            self.fields.set_counts(counts)
+
+        if self.track_openings:
+            zeros = bytes(0 if m or n else 1 for m, n in zip(mines, counts))
+            self.openings = OpeningIndex(self.topology, zeros)
+
+    def get_visible(self, loc):
+        '''
+        What the player can see on one field, as in get_board()
+        :param loc:
+        :return: False if covered, "f" if flagged, otherwise the value
+        '''
+        if self.engine != "fields":
+            return self.fields.get_visible(loc)
+
+        f = self.get_field(loc)
+        if f.revealed is False:
+            if f.flag:
+                return "f"
+            return False
+        return f.value
+
+    def __lay_deferred(self, loc):
+        '''
+        Lays the mines of a deferred board around its first reveal.
+        Keeps the field and its neighbours clear if there is room, or at
+        least the field itself.
+        :param loc: The field being revealed
+        '''
+        with _laying:
+            # Guard: Another reveal may have laid them while this one waited
+            if self.mines_laid:
+                return
+            if not self.lay_mines(self.__total_mines, self.seed, exclude={loc, *self.graph[loc]}):
+                self.lay_mines(self.__total_mines, self.seed, exclude={loc})
+            self.first = loc
+            if self.engine == "mmap":
+                self.fields.set_layout(self.__total_mines, self.seed, self.deferred, loc)
+            self.count_mines()
+            # Only once the counts are in, as reveals check it without the lock
+            self.mines_laid = True
+
+    def __open(self, loc):
+        '''
+        Opens a field, and the fields around it if it has no nearby mines.
+        Classic boards use a scanline fill, hexagon boards a frontier fill,
+        unless the opening of a 0 is already in self.openings.
+        :param loc:
+        :return: List of locs that were opened
+        '''
+        if not self.mines_laid:
+            self.__lay_deferred(loc)
+
+        if self.engine != "fields":
+            c = self.c
+            mines = self.fields.mines
+            counts = self.fields.counts
+            revealed = self.fields.revealed
+
+            def covered(row, col): return not revealed[row * c + col]
+            def zero(row, col): return not (mines[row * c + col] or counts[row * c + col])
+            def open(row, col): revealed[row * c + col] = 1
+        else:
+            fields = self.fields
+
+            def covered(row, col): return not fields[(row, col)].revealed
+            def zero(row, col): return fields[(row, col)].value == 0
+            def open(row, col): fields[(row, col)].reveal()
+
+        row, col = loc
+        if self.openings is not None and covered(row, col):
+            opening = self.openings.opening(loc)
+            if opening is not None:
+                # A 0: open the covered part of its opening in one go
+                opened = [_loc for _loc in opening if covered(*_loc)]
+                for _loc in opened:
+                    open(*_loc)
+                return opened
+
+        if self.mode == "classic":
+            return scanline_fill(row, col, self.r, self.c, covered, zero, open)
+        return frontier_fill(row, col, self.topology, covered, zero, open)
 
     def reveal(self, loc):
         '''
@@ -185,43 +457,25 @@ class Board:
         # ## Field user clicked
         # Get the field object
         field = self.get_field(loc)
-        if field is False:
+        if field is None:
             return
 
-        # This queue is for the 0-fill
-        queue = [loc]
-
-        # ## Other fields
-        while queue:
-            # Get the field object, using queue.pop
-            _loc = queue.pop()
-
-            field = self.get_field(_loc)
-
-            # Guard: Check that the Field exists
-            if field is False:
-                continue
-
-            # Guard: Only operate on covered tiles
-            if field.revealed:
-                continue
-
-            # Reveal the field
-            field.reveal()
-
-            # Guard: Only continue searching if this field contains a 0.
-            if field.value is not 0:
-                continue
-
-            # Find adjacent vertices
-            adjacent_locations = self.graph[_loc]
-            # Add them if they have no nearby mines.
-            for vertex in adjacent_locations:
-                queue.append(vertex)
+        self.__open(loc)
 
         # Return the board if successful
         return self.get_board()
 
+    def reveal_delta(self, loc):
+        '''
+        Reveal a field, like reveal(), but only report what changed.
+        :param loc:
+        :return: Dict of loc:value for every field this move opened
+        '''
+        if self.get_field(loc) is None:
+            return
+
+        return {_loc: self.get_visible(_loc) for _loc in self.__open(loc)}
+
     def flag(self, loc):
         '''
         Flags or unflags a field
@@ -231,7 +485,7 @@ class Board:
 
         # Get the field object
         field = self.get_field(loc)
-        if field is False:
+        if field is None:
             return
 
         # Toggle the flag
@@ -242,3 +496,20 @@ class Board:
 
         # Return the board
         return self.get_board()
+
+    def flag_delta(self, loc):
+        '''
+        Flags or unflags a field, like flag(), but only report what changed.
+        Flags on revealed fields can't be seen, so they change nothing.
+        :param loc:
+        :return: Dict of loc:value, empty if the player sees no change
+        '''
+        field = self.get_field(loc)
+        if field is None:
+            return
+
+        field.set_flag(not field.flag)
+
+        if field.revealed:
+            return {}
+        return {loc: self.get_visible(loc)}
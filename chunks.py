@@ -0,0 +1,235 @@
+import os, random
+from collections import OrderedDict, deque
+from planes import FieldPlanes
+from topology import TOPOLOGIES
+
+'''
+ChunkedBoard is an endless board.
+
+The plane is split into square chunks of size x size fields, each kept in a
+FieldPlanes store. A chunk is generated the first time it is touched: its
+mines come from a Random seeded with the board's seed and the chunk's
+coordinates, so the same chunk always gets the same mines. Counts along a
+chunk's edges need the mines of the chunks around it, which are generated the
+same way, so neighbouring chunks always agree.
+
+Only max_chunks chunks are kept in memory. The least recently used chunk is
+evicted first; if the player has revealed or flagged anything in it, those
+two planes are written to a file in path, and otherwise any file from an
+earlier eviction is removed. Mines and counts are generated again when it
+comes back.
+
+Locs are (row, col) and can be any integers, including negative ones.
+'''
+
+
+class ChunkedBoard:
+
+    # Padding around a chunk when counting. Two rows keep the hexagon row
+    # parity of the padded plane the same as on the board.
+    PAD = 2
+
+    def __init__(self, seed=0, density=0.15, mode="classic", size=32, max_chunks=256, path=".chunks", limit=100000):
+        '''
+        :param seed: Seed the whole board is generated from
+        :param density: Share of fields that are mined
+        :param size: Width and height of a chunk, must be even
+        :param max_chunks: Number of chunks kept in memory
+        :param path: Directory evicted chunks are written to
+        :param limit: Most fields one reveal() opens, as openings can go on forever
+        '''
+        # Guard: Hexagon rows alternate, so chunks must hold an even number of rows
+        if size % 2:
+            raise ValueError(f"Chunk size must be even, not {size}.")
+
+        self.seed = seed
+        self.density = density
+        self.mode = mode
+        self.size = size
+        self.max_chunks = max_chunks
+        self.path = path
+        self.limit = limit
+
+        # The legal moves for (even rows, odd rows)
+        self.moves = TOPOLOGIES[mode].moves
+        padded = size + 2 * self.PAD
+        self.__count = TOPOLOGIES[mode](padded, padded).count
+
+        self.chunks = OrderedDict()
+        # Mine planes are reused by up to nine chunks, so keep recent ones
+        self.__mine_planes = OrderedDict()
+        # Zero fields whose neighbours are still to be opened
+        self.frontier = deque()
+
+    def __mines(self, cy, cx):
+        # The mine plane of a chunk, the same every time for the same seed.
+        key = (cy, cx)
+        if key in self.__mine_planes:
+            self.__mine_planes.move_to_end(key)
+            return self.__mine_planes[key]
+
+        rng = random.Random(f"{self.seed}:{cy}:{cx}")
+        n = self.size * self.size
+        mines = bytearray(n)
+        for i in rng.sample(range(n), round(n * self.density)):
+            mines[i] = 1
+
+        self.__mine_planes[key] = mines
+        if len(self.__mine_planes) > 4 * self.max_chunks:
+            self.__mine_planes.popitem(last=False)
+        return mines
+
+    def __generate(self, cy, cx):
+        # Generates a chunk with its counts.
+        size, pad = self.size, self.PAD
+        padded = size + 2 * pad
+
+        # Mines of the chunk and a border from the chunks around it
+        mines = bytearray(padded * padded)
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                plane = self.__mines(cy + dy, cx + dx)
+                for row in range(size):
+                    y = row + dy * size + pad
+                    if not 0 <= y < padded:
+                        continue
+                    lo = max(0, -(dx * size + pad))
+                    hi = min(size, padded - (dx * size + pad))
+                    if lo < hi:
+                        x = dx * size + pad
+                        mines[y * padded + x + lo:y * padded + x + hi] = plane[row * size + lo:row * size + hi]
+
+        counts = self.__count(mines)
+        chunk = FieldPlanes(size, size)
+        for row in range(size):
+            start = (row + pad) * padded + pad
+            chunk.mines[row * size:(row + 1) * size] = mines[start:start + size]
+            chunk.counts[row * size:(row + 1) * size] = counts[start:start + size]
+        return chunk
+
+    def __file(self, cy, cx):
+        return os.path.join(self.path, f"{cy}_{cx}.chunk")
+
+    def chunk(self, cy, cx):
+        '''
+        Gets a chunk, loading or generating it if it isn't in memory
+        :param cy, cx: Chunk coordinates
+        :return: FieldPlanes of the chunk
+        '''
+        key = (cy, cx)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+
+        chunk = self.__generate(cy, cx)
+        try:
+            with open(self.__file(cy, cx), "rb") as f:
+                data = f.read()
+            n = self.size * self.size
+            chunk.revealed[:] = data[:n]
+            chunk.flagged[:] = data[n:]
+        except FileNotFoundError:
+            pass
+
+        self.chunks[key] = chunk
+        while len(self.chunks) > self.max_chunks:
+            self.__evict(*self.chunks.popitem(last=False))
+        return chunk
+
+    def __evict(self, key, chunk):
+        # Writes what the player did in a chunk to disk, if anything.
+        if 1 not in chunk.revealed and 1 not in chunk.flagged:
+            # Guard: A file from an earlier eviction would bring back what was undone
+            try:
+                os.remove(self.__file(*key))
+            except FileNotFoundError:
+                pass
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.__file(*key), "wb") as f:
+            f.write(chunk.revealed + chunk.flagged)
+
+    def flush(self):
+        # Writes every chunk in memory to disk.
+        for key, chunk in self.chunks.items():
+            self.__evict(key, chunk)
+
+    def __locate(self, loc):
+        # The chunk a loc is in, and the loc's index in it.
+        cy, row = divmod(loc[0], self.size)
+        cx, col = divmod(loc[1], self.size)
+        return self.chunk(cy, cx), row * self.size + col
+
+    def get_field(self, loc):
+        chunk, i = self.__locate(loc)
+        return chunk[divmod(i, self.size)]
+
+    def get_visible(self, loc):
+        '''
+        What the player can see on one field
+        :return: False if covered, "f" if flagged, otherwise the value
+        '''
+        chunk, i = self.__locate(loc)
+        return chunk.get_visible(divmod(i, self.size))
+
+    def get_region(self, row, col, rows, cols):
+        '''
+        What the player can see in a window of the board, like Board.get_board()
+        :return: List of rows * cols values, row by row
+        '''
+        return [self.get_visible((y, x)) for y in range(row, row + rows) for x in range(col, col + cols)]
+
+    def neighbours(self, loc):
+        row, col = loc
+        return [(row + edge_r, col + edge_c) for edge_r, edge_c in self.moves[row % 2]]
+
+    def reveal(self, loc):
+        '''
+        Reveals a field, and the fields around it if it has no nearby mines.
+        The fill generates chunks as it crosses into them. It stops after
+        self.limit fields; expand() carries on from there.
+        :param loc:
+        :return: Dict of loc:value for every field opened
+        '''
+        chunk, i = self.__locate(loc)
+        # Guard: Only operate on covered tiles
+        if chunk.revealed[i]:
+            return {}
+        chunk.revealed[i] = 1
+        changes = {loc: chunk.get_visible(divmod(i, self.size))}
+        if not chunk.mines[i] and not chunk.counts[i]:
+            self.frontier.append(loc)
+        changes.update(self.expand())
+        return changes
+
+    def expand(self, limit=None):
+        '''
+        Carries on opening the fields around 0s that a reveal left behind.
+        :param limit: Most fields to open, self.limit by default
+        :return: Dict of loc:value for every field opened
+        '''
+        if limit is None:
+            limit = self.limit
+        changes = {}
+        while self.frontier and len(changes) < limit:
+            for _loc in self.neighbours(self.frontier.popleft()):
+                chunk, i = self.__locate(_loc)
+                if chunk.revealed[i]:
+                    continue
+                # Mark on push, so no field is queued twice
+                chunk.revealed[i] = 1
+                changes[_loc] = chunk.get_visible(divmod(i, self.size))
+                if not chunk.counts[i]:
+                    self.frontier.append(_loc)
+        return changes
+
+    def flag(self, loc):
+        '''
+        Flags or unflags a field
+        :return: Dict of loc:value, empty if the field is revealed
+        '''
+        chunk, i = self.__locate(loc)
+        if chunk.revealed[i]:
+            return {}
+        chunk.flagged[i] ^= 1
+        return {loc: chunk.get_visible(divmod(i, self.size))}
@@ -1,4 +1,30 @@
+'''
+A Field keeps its whole state in one small integer:
+
+- bits 0-3: the number of nearby mines (0-8)
+- bit 4: mined
+- bit 5: flagged
+- bit 6: revealed
+
+PackedFields keeps those state bytes for a whole board in one bytearray, and
+hands out PackedField facades that read and write through to it.
+'''
+from collections.abc import Mapping
+
+COUNT = 0x0f
+MINE = 0x10
+FLAG = 0x20
+REVEALED = 0x40
+
+# Tables for bytes.translate, picking one bit of every state byte as 0 or 1
+_BIT = {bit: bytes(1 if s & bit else 0 for s in range(256)) for bit in (MINE, FLAG, REVEALED)}
+# Table for bytes.translate, clearing the count of every state byte
+_NO_COUNT = bytes(s & ~COUNT for s in range(256))
+
+
 class Field:
+    __slots__ = ("state",)
+
     def __init__(self):
         '''
         A Field
@@ -6,22 +32,140 @@ class Field:
         In task 1, 2; self.value will contain * or the number 0-9.
         In task 3, self.value will contain a number for a k-colour.
         '''
-        self.value = 0
-        self.flag = False
-        self.revealed = False
+        self.state = 0
+
+    def __getstate__(self):
+        return {"state": self.state}
+
+    def __setstate__(self, state):
+        if "state" in state:
+            self.state = state["state"]
+            return
+        # Fields pickled before packing kept value, flag and revealed
+        self.state = 0
+        self.value = state["value"]
+        self.set_flag(state["flag"])
+        if state["revealed"]:
+            self.reveal()
+
+    @property
+    def value(self):
+        if self.state & MINE:
+            return "*"
+        return self.state & COUNT
+
+    @value.setter
+    def value(self, v):
+        if v == "*":
+            self.state = (self.state & ~COUNT) | MINE
+        else:
+            self.state = (self.state & ~(MINE | COUNT)) | v
+
+    @property
+    def flag(self):
+        return self.state & FLAG != 0
+
+    @property
+    def revealed(self):
+        return self.state & REVEALED != 0
 
     def set_mine(self):
         self.value = "*"
     @property
     def is_mined(self):
-        if self.value is "*":
-            return True
-        return
+        return self.state & MINE != 0
     def set_flag(self, b):
         # Expects boolean
-        self.flag = b
+        if b:
+            self.state |= FLAG
+        else:
+            self.state &= ~FLAG
     def increment(self):
-        if self.value is not "*":
-            self.value += 1
+        if not self.state & MINE:
+            self.state += 1
     def reveal(self):
-        self.revealed = True
+        self.state |= REVEALED
+
+
+class PackedField(Field):
+    '''
+    A Field whose state byte lives in a PackedFields store
+    '''
+    __slots__ = ("store", "i")
+
+    def __init__(self, store, i):
+        self.store = store
+        self.i = i
+
+    @property
+    def state(self):
+        return self.store[self.i]
+
+    @state.setter
+    def state(self, s):
+        self.store[self.i] = s
+
+
+class PackedFields(Mapping):
+    '''
+    k:v store of loc:Field, one state byte per field, row by row.
+    '''
+
+    def __init__(self, r, c):
+        self.r = r
+        self.c = c
+        self.states = bytearray(r * c)
+
+    def __getitem__(self, loc):
+        try:
+            row, col = loc
+        except ValueError:
+            raise KeyError(loc)
+        if 0 <= row < self.r and 0 <= col < self.c:
+            return PackedField(self.states, row * self.c + col)
+        raise KeyError(loc)
+
+    def __iter__(self):
+        for row in range(self.r):
+            for col in range(self.c):
+                yield (row, col)
+
+    def __len__(self):
+        return self.r * self.c
+
+    def get_planes(self):
+        '''
+        :return: (mines, revealed, flagged) planes, one byte per field, 1 for set
+        '''
+        return tuple(self.states.translate(_BIT[bit]) for bit in (MINE, REVEALED, FLAG))
+
+    def get_mines(self):
+        '''
+        :return: Plane of mines, one byte per field, 1 for a mine
+        '''
+        return self.states.translate(_BIT[MINE])
+
+    def set_mines(self, indices):
+        # Mines the fields at the given flat indices.
+        states = self.states
+        for i in indices:
+            states[i] |= MINE
+
+    def set_counts(self, counts):
+        '''
+        Replaces the count of every field
+        :param counts: Plane of counts, one byte per field, 0 for mined fields
+        '''
+        # The counts were cleared first, so adding them never carries
+        states = int.from_bytes(self.states.translate(_NO_COUNT), "big") + int.from_bytes(counts, "big")
+        self.states[:] = states.to_bytes(len(self.states), "big")
+
+    def set_planes(self, mines, revealed, flagged):
+        '''
+        Replaces every state byte, clearing the counts
+        '''
+        states = 0
+        for bit, plane in ((MINE, mines), (REVEALED, revealed), (FLAG, flagged)):
+            # Each plane only holds 0s and 1s, so the bits never carry
+            states += int.from_bytes(plane, "big") * bit
+        self.states[:] = states.to_bytes(len(self.states), "big")
@@ -0,0 +1,97 @@
+'''
+Flood fills for opening the fields around a 0.
+
+Both fills open a field the moment it is found, so a field is only ever
+queued once. They are written against three callbacks, so they work the same
+for every board engine:
+
+- covered(row, col): True if the field hasn't been revealed
+- zero(row, col): True if the field has no nearby mines
+- open(row, col): reveals the field
+
+Each returns the list of locs it opened.
+'''
+
+
+def scanline_fill(row, col, r, c, covered, zero, open):
+    '''
+    Span fill for classic boards (8 neighbours per field).
+    Runs of 0s along a row are opened as one span. The rows above and below,
+    one field wider than the span to catch diagonals, are then scanned for
+    more 0s to start new spans from, and for numbers to open on the border.
+    :param row, col: Field the player clicked
+    :param r, c: Size of the board
+    :return: List of opened locs
+    '''
+    # Guard: Only operate on covered tiles
+    if not covered(row, col):
+        return []
+    if not zero(row, col):
+        open(row, col)
+        return [(row, col)]
+
+    opened = []
+    spans = []
+
+    def span(row, col):
+        # Opens the run of covered 0s through (row, col) and queues it.
+        x1 = col
+        while x1 > 0 and covered(row, x1 - 1) and zero(row, x1 - 1):
+            x1 -= 1
+        x2 = col
+        while x2 < c - 1 and covered(row, x2 + 1) and zero(row, x2 + 1):
+            x2 += 1
+        for x in range(x1, x2 + 1):
+            open(row, x)
+            opened.append((row, x))
+        spans.append((row, x1, x2))
+        return x2
+
+    span(row, col)
+    while spans:
+        row, x1, x2 = spans.pop()
+        lo = max(x1 - 1, 0)
+        hi = min(x2 + 1, c - 1)
+        for y in (row - 1, row, row + 1):
+            # Guard: Check that the row is not out of bounds
+            if not 0 <= y < r:
+                continue
+            x = lo
+            while x <= hi:
+                if covered(y, x):
+                    if zero(y, x):
+                        # Skip past the span we just opened
+                        x = span(y, x)
+                    else:
+                        open(y, x)
+                        opened.append((y, x))
+                x += 1
+    return opened
+
+
+def frontier_fill(row, col, topology, covered, zero, open):
+    '''
+    Frontier fill for any topology, used for hexagon boards.
+    :param row, col: Field the player clicked
+    :param topology: Topology that gives the neighbours of a field
+    :return: List of opened locs
+    '''
+    # Guard: Only operate on covered tiles
+    if not covered(row, col):
+        return []
+    open(row, col)
+    opened = [(row, col)]
+
+    # Guard: Only continue searching if this field contains a 0.
+    if not zero(row, col):
+        return opened
+
+    frontier = [(row, col)]
+    while frontier:
+        for y, x in topology.neighbours(frontier.pop()):
+            if covered(y, x):
+                open(y, x)
+                opened.append((y, x))
+                if zero(y, x):
+                    frontier.append((y, x))
+    return opened
@@ -0,0 +1,157 @@
+import os, threading, time, json, itertools, atexit
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+'''
+Opt-in timing of the stages of each move, to see where lag comes from.
+
+Set MINESWEEPER_TRACE to a file name to turn it on, for example:
+    MINESWEEPER_TRACE=trace.json python main.py
+
+A move gets a Move from move() when it starts, and stage() ends the stage
+it is in, recording a span from the end of the last stage to now. Spans
+go into a ring buffer of the latest SIZE spans. At exit they are written as
+Chrome trace events, which chrome://tracing and Perfetto open, and
+summary() gives the p50/p95/p99 of each stage.
+
+When it is off, move() returns None and everything else returns straight
+away, so the hooks cost a function call each.
+'''
+
+ENV = "MINESWEEPER_TRACE"
+SIZE = 100000
+
+# The ring buffer of (name, move id, thread id, start ns, end ns), None when off
+_spans = None
+_ids = itertools.count(1)
+
+
+class Move:
+    __slots__ = ("id", "stamp")
+
+    def __init__(self):
+        self.id = next(_ids)
+        self.stamp = time.perf_counter_ns()
+
+
+def enable(size=SIZE):
+    # Starts recording, dropping anything recorded before.
+    global _spans
+    _spans = deque(maxlen=size)
+
+
+def disable():
+    global _spans
+    _spans = None
+
+
+def enabled():
+    return _spans is not None
+
+
+def move():
+    '''
+    Starts timing a move
+    :return: Move, or None when off
+    '''
+    if _spans is None:
+        return None
+    return Move()
+
+
+def stage(name, move):
+    '''
+    Ends the stage a move is in, and starts the next one
+    :param name: Name of the stage that ended
+    :param move: Move from move(), or None
+    '''
+    if move is None or _spans is None:
+        return
+    now = time.perf_counter_ns()
+    _spans.append((name, move.id, threading.get_ident(), move.stamp, now))
+    move.stamp = now
+
+
+@contextmanager
+def _span(name):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _spans.append((name, 0, threading.get_ident(), start, time.perf_counter_ns()))
+
+
+def span(name):
+    '''
+    Times a block that isn't part of a move, as in `with span("snapshot"):`
+    '''
+    if _spans is None:
+        return nullcontext()
+    return _span(name)
+
+
+def timed(name, fn):
+    '''
+    Wraps a function so each call is a span, if recording is on
+    :return: The wrapped function, or fn itself when off
+    '''
+    if _spans is None:
+        return fn
+
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def percentile(ordered, p):
+    # Nearest-rank percentile of a sorted list.
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+def summary():
+    '''
+    :return: Dict of stage:{count, p50, p95, p99} with times in milliseconds
+    '''
+    durations = {}
+    for name, move_id, thread, start, end in list(_spans or ()):
+        durations.setdefault(name, []).append((end - start) / 1e6)
+    result = {}
+    for name, times in durations.items():
+        times.sort()
+        result[name] = {
+            "count": len(times),
+            "p50": percentile(times, 50),
+            "p95": percentile(times, 95),
+            "p99": percentile(times, 99),
+        }
+    return result
+
+
+def chrome_trace():
+    '''
+    :return: The spans as a Chrome trace event document
+    '''
+    pid = os.getpid()
+    events = [
+        {
+            "name": name, "cat": "move" if move_id else "background", "ph": "X",
+            "ts": start / 1000, "dur": (end - start) / 1000,
+            "pid": pid, "tid": thread, "args": {"move": move_id}
+        }
+        for name, move_id, thread, start, end in list(_spans or ())
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export(path):
+    # Writes the spans as Chrome trace events, and prints the summary.
+    with open(path, "w") as f:
+        json.dump(chrome_trace(), f)
+    for name, stats in summary().items():
+        print(f"{name:<14}{stats['count']:>7}  p50 {stats['p50']:8.3f}ms  p95 {stats['p95']:8.3f}ms  p99 {stats['p99']:8.3f}ms")
+
+
+if os.environ.get(ENV):
+    enable()
+    atexit.register(export, os.environ[ENV])
@@ -20,20 +20,31 @@ import time
 from score import Scores
 
 # Import buttons
-from views.squarebutton import SquareGuiField
+from views.squarebutton import SquareGuiField, install_style
 from views.hexbutton import HexGuiField
 from views.smiley import SmileyButton
+from views.boardview import BoardView
 
 # Import load/save functionality
 import save_state as save
+from autosave import AutoSaver
+from noguess import NoGuessPool
+import instrument
 
 # Web browser for showing Wikipedia
 import webbrowser
 
+# Moves go to the save journal as they happen. It is compacted into a new
+# snapshot after this many seconds without a move, or after this many moves.
+AUTOSAVE_QUIET = 1.0
+AUTOSAVE_EVERY = 100
+
 
 class MainApplication(QMainWindow):
     def __init__(self, *args, **kwargs):
         super(MainApplication, self).__init__(*args, **kwargs)
+        # Classic fields are styled by one stylesheet for the whole application
+        install_style()
         # Tell the application that we don't have a menu
         self.restart = False
         self.from_save = False
@@ -42,6 +53,26 @@ class MainApplication(QMainWindow):
         # Default start mode
         self.difficulty = "beginner"
         self.mode = "classic"
+
+        # Snapshots are coalesced and written in the background
+        self.autosave = AutoSaver(instrument.timed("snapshot", save.compact), quiet=AUTOSAVE_QUIET, every=AUTOSAVE_EVERY)
+
+        # No-guess boards are generated ahead of time, so starting never waits
+        self.no_guess = False
+        self.noguess = NoGuessPool()
+        # A board picked by its ID, to play in the next game
+        self.next_board = None
+
+        # Paint the board as one BoardView, rather than a button per field
+        self.single_view = False
+        self.view = None
+        # Field widgets are kept from game to game
+        self.buttons = []
+        self.visible = []
+
+        # start() closes the window on every restart, so closeEvent can't tell
+        # the game is over; quitting is when the background work is stopped
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
         self.start()
 
 
@@ -57,13 +88,13 @@ class MainApplication(QMainWindow):
         # Set number of flags to 0
         self.flags = 0
 
-        if self.restart:
-            # Clean up memory
-            for b in self.buttons:
-                b.deleteLater()
+        # Any save still waiting belongs to the previous game
+        self.autosave.cancel()
 
+        if self.restart:
             # Initialise a brand new Board
-            self.board = Board(self.difficulty, self.mode)
+            self.board = self.new_board()
+            self.from_save = False
         else:
             # If fresh start; try and load a serialised board object.
             save_obj = self.load()
@@ -86,7 +117,11 @@ class MainApplication(QMainWindow):
                     self.close()
             else:
                 # Create a new one
-                self.board = Board(self.difficulty, self.mode)
+                self.board = self.new_board()
+
+        if not self.from_save:
+            # Start the journal from a snapshot of the new board
+            save.compact(self.board, self.counter, self.flags)
 
         self.total_mines = self.board.get_total_number_of_mines()
 
@@ -95,8 +130,6 @@ class MainApplication(QMainWindow):
         # Create new Thread pool
         self.threadpool = QThreadPool()
 
-        self.buttons = []
-
 
         # If loss is true, the GUIFields are not clickable
         self.loss = False
@@ -107,6 +140,53 @@ class MainApplication(QMainWindow):
         # Initialise the UI
         self.initUI()
 
+    def new_board(self):
+        '''
+        A ready no-guess board if no-guess is on and one is ready, otherwise a plain one.
+        :return: Board
+        '''
+        if self.next_board is not None:
+            board, self.next_board = self.next_board, None
+            return board
+        if self.no_guess:
+            board = self.noguess.take(self.mode, self.difficulty)
+            if board is not None:
+                return board
+        # Mines are laid on the first click, so it is always safe
+        return Board(self.difficulty, self.mode, deferred=True)
+
+    def play_board_id(self):
+        '''
+        Asks for a board ID, and starts a game on the board it was made from
+        :return:
+        '''
+        text, okPressed = QInputDialog.getText(self, "Play a board", "Board ID:", QLineEdit.Normal, "")
+        if not okPressed or text == '':
+            return
+        try:
+            board = Board.from_id(text.strip().lstrip("#"))
+        except ValueError:
+            QMessageBox.warning(self, "Play a board", f"{text} is not a board ID.")
+            return
+        # Guard: The window only fits the standard difficulties
+        if board.difficulty == "custom":
+            QMessageBox.warning(self, "Play a board", "Boards of a custom size can't be played here.")
+            return
+        self.next_board = board
+        self.mode = board.mode
+        self.difficulty = board.difficulty
+        self.start()
+
+    def change_single_view(self, on):
+        self.single_view = on
+        self.start()
+
+    def change_no_guess(self, on):
+        self.no_guess = on
+        if on:
+            # Start generating, so the next game has one ready
+            self.noguess.fill(self.mode, self.difficulty)
+
     def change_difficulty(self, difficulty):
         self.difficulty = difficulty
         self.start()
@@ -124,8 +204,7 @@ class MainApplication(QMainWindow):
         '''
 
         # Minesweeper window
-        self.title = f"Minesweeper ({self.difficulty.capitalize()})"
-        self.setWindowTitle(self.title)
+        self.show_title()
 
         sizes = {
             # mode_difficulty: (x, y, centre)
@@ -178,16 +257,25 @@ class MainApplication(QMainWindow):
 
             # Add the action to the relevant menus, by surrounding them in menu.addAction()
             menubar.addAction(add_action("new game", self, self.start))
+            menubar.addAction(add_action("play board ID", self, self.play_board_id))
 
             menu_mode = menubar.addMenu("Gamemode")
             menu_mode.addAction(add_action("play classic mode", self, self.change_mode, "classic"))
             menu_mode.addAction(add_action("play hexagon mode", self, self.change_mode, "hexagon"))
+            no_guess = QAction("No guessing", self, checkable=True)
+            no_guess.toggled.connect(self.change_no_guess)
+            menu_mode.addAction(no_guess)
 
             menu_difficulty = menubar.addMenu("Difficulty")
             menu_difficulty.addAction(add_action("beginner", self, self.change_difficulty, "beginner"))
             menu_difficulty.addAction(add_action("intermediate", self, self.change_difficulty, "intermediate"))
             menu_difficulty.addAction(add_action("expert", self, self.change_difficulty, "expert"))
 
+            menu_view = menubar.addMenu("View")
+            single_view = QAction("Paint the board as one widget", self, checkable=True)
+            single_view.toggled.connect(self.change_single_view)
+            menu_view.addAction(single_view)
+
             menu_scores = menubar.addMenu("Highscores")
             menu_scores.addAction(add_action("beginner", self, self.view_highscores, "beginner"))
             menu_scores.addAction(add_action("intermediate", self, self.view_highscores, "intermediate"))
@@ -222,24 +310,84 @@ class MainApplication(QMainWindow):
             for col in range(self.board.c):
                 positions.append((row, col))
 
+        self.layout_fields()
+
+        # What the player sees on each field, so moves only repaint what changed.
+        self.visible = [False] * len(positions)
+        self.blanks = len(positions)
+        self.flags = 0
+
+        # Saved boards, and no-guess boards with their first click opened,
+        # start with fields showing
+        shown = self.board.get_board()
+        if any(f is not False for f in shown):
+            self.update_fields(dict(zip(positions, shown)))
+
+        # Set it to a class variable
+        self.show()
+
+
+    def layout_fields(self):
+        '''
+        Gets the field widgets ready for a new game.
+        The widgets of the last game are kept. Only fields that were uncovered
+        or flagged are reset, and widgets are only made or removed when the
+        size or mode of the board changes. Their click connections stay.
+        :return:
+        '''
+        r, c = self.board.r, self.board.c
+
+        if self.single_view:
+            for b in self.buttons:
+                b.deleteLater()
+            self.buttons = []
+            view = self.view
+            if view is not None and (view.r, view.c, view.mode) == (r, c, self.mode):
+                view.reset()
+                return
+            if view is not None:
+                view.deleteLater()
+            # One widget paints every field
+            self.view = BoardView(r, c, self.mode, self)
+            self.view.move(6, 50)
+            self.view.left_click(self.click_field)
+            self.view.right_click(self.flag_field)
+            return
+
+        if self.view is not None:
+            self.view.deleteLater()
+            self.view = None
+
         if self.mode == "classic":
             gui_field = SquareGuiField
         elif self.mode == "hexagon":
             gui_field = HexGuiField
 
-        self.buttons = []
-        for position in positions:
-            self.buttons.append(gui_field(position, self))
+        # Guard: Widgets of the other mode can't be reused
+        if self.buttons and type(self.buttons[0]) is not gui_field:
+            for b in self.buttons:
+                b.deleteLater()
+            self.buttons = []
+
+        # Reset what the last game changed, or move every field if the size changed
+        n = r * c
+        if len(self.buttons) == n and len(self.visible) == n and self.buttons[-1].loc == (r - 1, c - 1):
+            for b, f in zip(self.buttons, self.visible):
+                if f is not False:
+                    b.reset()
+        else:
+            for b in self.buttons[n:]:
+                b.deleteLater()
+            del self.buttons[n:]
+            for i, b in enumerate(self.buttons):
+                b.reset()
+                b.place(divmod(i, c))
+
+        for i in range(len(self.buttons), n):
+            self.buttons.append(gui_field(divmod(i, c), self))
             self.buttons[-1].left_click(self.click_field)
             self.buttons[-1].right_click(self.flag_field)
 
-        if self.from_save:
-            self.update_fields(self.board.get_board())
-
-        # Set it to a class variable
-        self.show()
-
-
     def start_timer(self):
         self.timer = QTimer()
         self.timer.setInterval(1000)
@@ -255,56 +403,77 @@ class MainApplication(QMainWindow):
         self.smiley.state = 0
         self.smiley.left_click(self.start)
 
-    def update_fields(self, board):
+    def update_fields(self, changes, move=None):
         """
-        Updates all the fields on the board
-        :param board:
+        Updates the fields that changed on the board
+        :param changes: Dict of loc:value from Board.reveal_delta/flag_delta
+        :param move: instrument.Move timing the move, if tracing
         :return:
         """
+        instrument.stage("signal", move)
 
-        if not board:
+        if changes is None:
             print("Error: Board.update_fields() could not access Board")
             return
-        # Need to count flags
-        self.flags = 0
-        # Before we count, there are no blank squares
-        blanks = False
         # By default, we haven't lost yet
         loss = False
 
-        for f, b in zip(board, self.buttons):
+        for loc, f in changes.items():
+            i = loc[0] * self.board.c + loc[1]
+
+            # Forget what the field showed before, then count what it shows now
+            old = self.visible[i]
+            if old is False:
+                self.blanks -= 1
+            elif old == "f":
+                self.flags -= 1
+            self.visible[i] = f
+
             if f is False:
-                b.text = ""
                 # There are still blanks, so player can't win.
-                blanks = True
-            elif f is "f":
-                b.text = "f"
+                self.blanks += 1
+            elif f == "f":
                 self.flags += 1
-            elif f is "*":
-                b.text = "*"
-                b.flatten()
+            elif f == "*":
                 # We've lost
                 loss = True
-            elif f is 0:
+
+            if self.view is not None:
+                self.view.set_cell(loc, f)
+                continue
+
+            b = self.buttons[i]
+            if f is False:
+                b.text = ""
+            elif f == "f":
+                b.text = "f"
+            elif f == "*":
+                b.text = "*"
+                b.flatten()
+            elif f == 0:
                 b.text = ""
                 b.flatten()
             else:
                 # Number
                 b.flatten(int(f))
                 b.text = str(f)
+        instrument.stage("widgets", move)
 
         # Check for win condition (player must flag all mines and clear all tiles)
-        if self.total_mines - self.flags == 0 and blanks is False:
+        if self.total_mines - self.flags == 0 and self.blanks == 0:
             # Destroy the save
+            self.autosave.cancel()
             save.destroy()
             self.show_win()
         elif loss:
             # Destroy the save
+            self.autosave.cancel()
             save.destroy()
             self.show_loss()
-        else:
+        elif changes:
             # If this isn't the winning move, we can save the game.
             self.save_state()
+            instrument.stage("save", move)
 
     def view_highscores(self, difficulty):
         '''
@@ -373,18 +542,27 @@ class MainApplication(QMainWindow):
         if okPressed and text != '':
             # Record the score
             sc = Scores()
-            # name, points, difficulty
-            sc.write_highscore(text, self.counter, self.mode, self.difficulty)
+            # name, points, difficulty, and the board ID to play the board again
+            sc.write_highscore(text, self.counter, self.mode, self.difficulty, self.board.board_id)
             sc.save()
             print("Score recorded")
         return
 
 
+    def show_title(self):
+        # Shows the board ID in the title, it changes when the first click lays the mines
+        self.title = f"Minesweeper ({self.difficulty.capitalize()})"
+        board_id = self.board.board_id
+        if board_id:
+            self.title += f" #{board_id}"
+        self.setWindowTitle(self.title)
+
     def refreshUI(self):
         '''
         Refreshes the other parts of the UI
         :return:
         '''
+        self.show_title()
         mines_left = int(self.total_mines - self.flags)
         self.unflagged_mines.setText(f"{mines_left:0>3}")
 
@@ -402,10 +580,11 @@ class MainApplication(QMainWindow):
         self.smiley.state = 1
 
         # Create a new worker, and pass it the click field
-        # Pass the reference to the board.reveal method, with loc as an argument
-        worker = Worker(self.board.reveal, loc)
+        # Pass the reference to the reveal_move method, with loc as an argument
+        move = instrument.move()
+        worker = Worker(self.reveal_move, loc, move)
         # We update the button when the result comes back.
-        worker.signals.result.connect(self.update_fields)
+        worker.signals.result.connect(lambda changes, move=move: self.update_fields(changes, move))
         # We update the entire UI when the thread is finished.
         worker.signals.finished.connect(self.refreshUI)
         self.threadpool.start(worker)
@@ -420,14 +599,52 @@ class MainApplication(QMainWindow):
         if self.loss:
             return
         # Create a new worker, and pass it the click field
-        # Pass the reference to the board.reveal method, with loc as an argument
-        worker = Worker(self.board.flag, loc)
+        # Pass the reference to the flag_move method, with loc as an argument
+        move = instrument.move()
+        worker = Worker(self.flag_move, loc, move)
         # We update the button when the result comes back.
-        worker.signals.result.connect(self.update_fields)
+        worker.signals.result.connect(lambda changes, move=move: self.update_fields(changes, move))
         # We update the entire UI when the thread is finished.
         worker.signals.finished.connect(self.refreshUI)
         self.threadpool.start(worker)
 
+    def reveal_move(self, loc, move=None):
+        '''
+        Reveals a field and writes the move to the save journal.
+        Runs on a worker thread.
+        :param loc:
+        :param move: instrument.Move timing the move, if tracing
+        :return: Changes from board.reveal_delta()
+        '''
+        instrument.stage("queue wait", move)
+        # A snapshot can't be taken halfway through the move
+        with save.journal_lock:
+            changes = self.board.reveal_delta(loc)
+            instrument.stage("board", move)
+            if changes:
+                save.log_move(save.REVEAL, loc, self.counter)
+        instrument.stage("journal", move)
+        return changes
+
+    def flag_move(self, loc, move=None):
+        '''
+        Flags or unflags a field and writes the move to the save journal.
+        Runs on a worker thread.
+        :param loc:
+        :param move: instrument.Move timing the move, if tracing
+        :return: Changes from board.flag_delta()
+        '''
+        instrument.stage("queue wait", move)
+        # A snapshot can't be taken halfway through the move
+        with save.journal_lock:
+            changes = self.board.flag_delta(loc)
+            instrument.stage("board", move)
+            if changes:
+                op = save.FLAG_ON if changes[loc] == "f" else save.FLAG_OFF
+                save.log_move(op, loc, self.counter)
+        instrument.stage("journal", move)
+        return changes
+
     def recurring_timer(self):
         if self.loss is False:
             self.counter += 1
@@ -437,17 +654,16 @@ class MainApplication(QMainWindow):
 
     def save_state(self):
         """
-        Creates a new worker to save the Board state
+        Asks the autosaver to save the Board state
+        Bursts of moves are written once, in the background.
         :return:
         """
-        save_obj = {
-            "board": self.board,
-            "counter": self.counter,
-            "flags": self.flags
-        }
-        # We don't need anything back from it.
-        worker = Worker(save.save, save_obj)
-        self.threadpool.start(worker)
+        self.autosave.schedule(self.board, self.counter, self.flags)
+
+    def shutdown(self):
+        # Writes the last moves, and stops the autosaver and no-guess pool before quitting.
+        self.autosave.close()
+        self.noguess.close()
 
     def load(self):
         # See if there's a save file.
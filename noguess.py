@@ -0,0 +1,205 @@
+import os, random, threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from board import Board, SETTINGS
+from topology import TOPOLOGIES, GraphView
+from solver import Solver
+
+'''
+No-guess boards can be cleared from their first click without ever guessing.
+
+generate() lays mines away from the first click and plays the board with the
+Solver. When the solver gets stuck, the board is repaired rather than thrown
+away: one mine is moved between a field the solver could not work out next to
+the opened area and a covered field away from it, and the board is played
+again. The first click and its neighbours never take a mine, so it always
+opens an area. After too many repairs it starts again on a fresh layout, and
+after too many fresh layouts it gives up, as some sizes have no no-guess
+layout at all.
+
+A generated board comes back with its first click already opened, so the
+player starts from the area the solver started from.
+
+NoGuessPool keeps a few boards ready per (mode, difficulty), generating more
+on a process pool in the background. take() never waits for one.
+'''
+
+
+def play(graph, mines, counts, c, first, total):
+    '''
+    Plays a layout with the solver from the first click
+    :param mines, counts: Planes of the layout
+    :param first: loc of the first click
+    :return: Solver after it ran out of safe fields
+    '''
+    solver = Solver(graph, total)
+
+    def open(loc):
+        # Opens a field, and the fields around it if it has no nearby mines.
+        changes = {}
+        stack = [loc]
+        while stack:
+            _loc = stack.pop()
+            if _loc in changes or _loc in solver.revealed:
+                continue
+            i = _loc[0] * c + _loc[1]
+            changes[_loc] = counts[i]
+            if not counts[i]:
+                stack.extend(graph[_loc])
+        return changes
+
+    solver.update(open(first))
+    while solver.safe:
+        changes = {}
+        for loc in list(solver.safe):
+            changes.update(open(loc))
+        solver.update(changes)
+    return solver
+
+
+# Fresh layouts to try before giving up
+LAYOUTS = 100
+
+
+def generate(r, c, total, mode="classic", first=None, seed=None, repairs=None, layouts=LAYOUTS):
+    '''
+    Generates a layout that the solver clears from the first click
+    :param r, c: Size of the board
+    :param total: Number of mines
+    :param first: loc of the first click, the middle of the board by default
+    :param seed: Optional seed, the same seed generates the same layout
+    :param repairs: Most mines to move before starting on a fresh layout
+    :param layouts: Most fresh layouts to try
+    :return: (mines plane, first), or None if the mines can't fit around the
+             first click or no layout was solved
+    '''
+    rng = random.Random(seed)
+    topology = TOPOLOGIES[mode](r, c)
+    graph = GraphView(topology)
+    if first is None:
+        first = (r // 2, c // 2)
+    if repairs is None:
+        repairs = r * c
+
+    # Guard: The first click and its neighbours must stay clear
+    keep = {first, *graph[first]}
+    free = [i for i in range(r * c) if divmod(i, c) not in keep]
+    if total > len(free):
+        return None
+
+    for layout in range(layouts):
+        mines = bytearray(r * c)
+        for i in rng.sample(free, total):
+            mines[i] = 1
+
+        for attempt in range(repairs):
+            counts = topology.count(mines)
+            solver = play(graph, mines, counts, c, first, total)
+            if len(solver.revealed) + total == r * c:
+                return bytes(mines), first
+
+            # Fields the solver could not work out, next to what it opened or not
+            unknown = [
+                loc for loc in graph
+                if loc not in solver.revealed and loc not in solver.mines and loc not in keep
+            ]
+            border, inside = [], []
+            for loc in unknown:
+                if any(e in solver.revealed for e in graph[loc]):
+                    border.append(loc)
+                else:
+                    inside.append(loc)
+            if not border:
+                border, inside = unknown, unknown
+
+            # Move a mine from the border inside, or from inside onto the border
+            loc = rng.choice(border)
+            i = loc[0] * c + loc[1]
+            targets = [e for e in inside if mines[e[0] * c + e[1]] != mines[i]]
+            if not targets:
+                break
+            e = rng.choice(targets)
+            j = e[0] * c + e[1]
+            mines[i], mines[j] = mines[j], mines[i]
+    return None
+
+
+def generate_board(difficulty="beginner", mode="classic", seed=None):
+    '''
+    Generates a no-guess board with its first click opened
+    :param difficulty: Name of the difficulty, or (squares-x, squares-y, number of bombs)
+    :return: Board, or None if it can't be generated
+    '''
+    r, c, total = difficulty if isinstance(difficulty, tuple) else SETTINGS[difficulty]
+    layout = generate(r, c, total, mode, seed=seed)
+    if layout is None:
+        return None
+    mines, first = layout
+    board = Board.from_planes(
+        "custom" if isinstance(difficulty, tuple) else difficulty,
+        mode, r, c, mines, bytes(r * c), bytes(r * c)
+    )
+    board.reveal_delta(first)
+    return board
+
+
+class NoGuessPool:
+
+    def __init__(self, size=3, workers=None):
+        '''
+        :param size: Number of boards to keep ready per (mode, difficulty)
+        :param workers: Processes to generate boards on
+        '''
+        self.size = size
+        self.workers = workers or os.cpu_count()
+        self.__boards = {}
+        self.__pending = {}
+        self.__lock = threading.Lock()
+        self.__pool = None
+
+    def fill(self, mode, difficulty):
+        # Starts generating boards until size of them are ready or on the way.
+        with self.__lock:
+            key = (mode, difficulty)
+            ready = self.__boards.setdefault(key, deque())
+            missing = self.size - len(ready) - self.__pending.get(key, 0)
+            self.__pending[key] = self.__pending.get(key, 0) + max(0, missing)
+            if self.__pool is None:
+                self.__pool = ProcessPoolExecutor(self.workers)
+            pool = self.__pool
+        # Outside the lock, as a callback on a future that is already done runs straight away
+        for i in range(missing):
+            future = pool.submit(generate_board, difficulty, mode, random.getrandbits(64))
+            future.add_done_callback(lambda future, key=key: self.__done(key, future))
+
+    def __done(self, key, future):
+        with self.__lock:
+            self.__pending[key] -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            board = future.result()
+            if board is not None:
+                self.__boards[key].append(board)
+
+    def ready(self, mode, difficulty):
+        # Number of boards ready to play.
+        with self.__lock:
+            return len(self.__boards.get((mode, difficulty), ()))
+
+    def take(self, mode, difficulty):
+        '''
+        Takes a ready board and starts generating its replacement
+        :return: Board, or None if none is ready yet
+        '''
+        with self.__lock:
+            ready = self.__boards.get((mode, difficulty))
+            board = ready.popleft() if ready else None
+        self.fill(mode, difficulty)
+        return board
+
+    def close(self):
+        # Stops the process pool, dropping boards still being generated.
+        with self.__lock:
+            pool, self.__pool = self.__pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
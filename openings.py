@@ -0,0 +1,92 @@
+'''
+OpeningIndex labels every opening on a board once the mines are counted.
+
+An opening is a connected region of 0s together with the numbered fields on
+its border, which is exactly what one click on any of its 0s reveals.
+Regions are found with a union-find pass over the 0s, joining each 0 to the
+0s among its neighbours, so it follows whatever topology the board uses.
+
+Fields are stored as flat indices (row * c + col).
+'''
+from array import array
+
+
+class OpeningIndex:
+
+    def __init__(self, topology, zeros):
+        '''
+        :param topology: Topology of the board
+        :param zeros: Plane of r * c bytes, 1 for an unmined field with count 0
+        '''
+        self.c = c = topology.c
+        n = topology.r * c
+
+        # Union-find: every 0 joins the 0s before it
+        parent = array("i", range(n))
+
+        def find(i):
+            while parent[i] != i:
+                # Path halving
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i in range(n):
+            if not zeros[i]:
+                continue
+            for row, col in topology.neighbours(divmod(i, c)):
+                j = row * c + col
+                if j < i and zeros[j]:
+                    a, b = find(i), find(j)
+                    if a != b:
+                        parent[max(a, b)] = min(a, b)
+
+        # Label each 0 with the number of its opening
+        self.labels = array("i", [-1]) * n
+        self.regions = []
+        for i in range(n):
+            if not zeros[i]:
+                continue
+            root = find(i)
+            if self.labels[root] == -1:
+                self.labels[root] = len(self.regions)
+                self.regions.append(array("i"))
+            self.labels[i] = self.labels[root]
+            self.regions[self.labels[i]].append(i)
+
+        # Add the numbered border to each opening
+        added = array("i", [-1]) * n
+        for label, region in enumerate(self.regions):
+            border = array("i")
+            for i in region:
+                for row, col in topology.neighbours(divmod(i, c)):
+                    j = row * c + col
+                    if not zeros[j] and added[j] != label:
+                        added[j] = label
+                        border.append(j)
+            region.extend(border)
+
+    def __len__(self):
+        # The number of openings on the board
+        return len(self.regions)
+
+    def label(self, loc):
+        '''
+        :param loc:
+        :return: Number of the opening a 0 belongs to, None for other fields
+        '''
+        label = self.labels[loc[0] * self.c + loc[1]]
+        if label == -1:
+            return None
+        return label
+
+    def opening(self, loc):
+        '''
+        Every field one click on loc reveals
+        :param loc:
+        :return: List of locs, None if loc is not a 0
+        '''
+        label = self.label(loc)
+        if label is None:
+            return None
+        return [divmod(i, self.c) for i in self.regions[label]]
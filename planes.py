@@ -0,0 +1,292 @@
+'''
+FieldPlanes is a drop-in replacement for the Board's k:v store of loc:Field.
+
+Instead of one Field object per vertex, the state of every vertex lives in
+four contiguous planes of one byte per vertex, stored row by row:
+
+- mines: 1 if the vertex is mined
+- counts: the number of mined neighbours (0-8)
+- revealed: 1 if the vertex has been revealed
+- flagged: 1 if the vertex has been flagged
+
+fields[loc] hands out a light PlaneField that reads and writes through to the
+planes, so code written against Field keeps working.
+
+MappedPlanes keeps the same planes in a memory-mapped file instead of memory:
+a 64 byte header (size, mode, difficulty, timer counter and flags, then the
+total number of mines, seed, whether the board is deferred and its first
+click) followed by the four planes. Changes go straight to the file, saving is a flush, and other
+processes can attach to the file, read-only if they like.
+'''
+import mmap, struct
+
+MAPPED_MAGIC = b"PMSM"
+MAPPED_HEADER = struct.Struct("<4sII12s16sIIIIBI")
+MAPPED_SIZE = 64
+
+# Bits of the layout byte in the header. Files written before it existed
+# have it at 0, and their totals are worked out from the mine plane.
+LAYOUT_STORED = 1
+LAYOUT_DEFERRED = 2
+LAYOUT_SEED = 4
+LAYOUT_FIRST = 8
+
+
+class PlaneField:
+    '''
+    A Field facade over one vertex of a FieldPlanes store.
+    '''
+    __slots__ = ("planes", "i")
+
+    def __init__(self, planes, i):
+        self.planes = planes
+        self.i = i
+
+    @property
+    def value(self):
+        if self.planes.mines[self.i]:
+            return "*"
+        return self.planes.counts[self.i]
+
+    @value.setter
+    def value(self, v):
+        if v == "*":
+            self.planes.mines[self.i] = 1
+        else:
+            self.planes.mines[self.i] = 0
+            self.planes.counts[self.i] = v
+
+    @property
+    def flag(self):
+        return self.planes.flagged[self.i] == 1
+
+    @property
+    def revealed(self):
+        return self.planes.revealed[self.i] == 1
+
+    def set_mine(self):
+        self.planes.mines[self.i] = 1
+
+    @property
+    def is_mined(self):
+        return self.planes.mines[self.i] == 1
+
+    def set_flag(self, b):
+        # Expects boolean
+        self.planes.flagged[self.i] = 1 if b else 0
+
+    def increment(self):
+        if not self.planes.mines[self.i]:
+            self.planes.counts[self.i] += 1
+
+    def reveal(self):
+        self.planes.revealed[self.i] = 1
+
+
+class FieldPlanes:
+
+    def __init__(self, r, c):
+        self.r = r
+        self.c = c
+        size = r * c
+        self.mines = bytearray(size)
+        self.counts = bytearray(size)
+        self.revealed = bytearray(size)
+        self.flagged = bytearray(size)
+
+    def index(self, loc):
+        '''
+        Converts a loc to a position in the planes.
+        :param loc: (row, col)
+        :return: Flat index. Raises KeyError if the loc is out of bounds.
+        '''
+        try:
+            row, col = loc
+        except ValueError:
+            raise KeyError(loc)
+        if 0 <= row < self.r and 0 <= col < self.c:
+            return row * self.c + col
+        raise KeyError(loc)
+
+    def __getitem__(self, loc):
+        return PlaneField(self, self.index(loc))
+
+    def __contains__(self, loc):
+        try:
+            self.index(loc)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        for row in range(self.r):
+            for col in range(self.c):
+                yield (row, col)
+
+    def __len__(self):
+        return self.r * self.c
+
+    def get_visible(self, loc):
+        '''
+        What the player can see on one field, as in Board.get_visible
+        '''
+        i = self.index(loc)
+        if not self.revealed[i]:
+            return "f" if self.flagged[i] else False
+        if self.mines[i]:
+            return "*"
+        return self.counts[i]
+
+    def get_planes(self):
+        '''
+        :return: (mines, revealed, flagged) planes, one byte per field, 1 for set
+        '''
+        return bytes(self.mines), bytes(self.revealed), bytes(self.flagged)
+
+    def set_planes(self, mines, revealed, flagged):
+        '''
+        Replaces the mine, revealed and flag planes, clearing the counts
+        '''
+        self.mines[:] = mines
+        self.revealed[:] = revealed
+        self.flagged[:] = flagged
+        self.counts[:] = bytes(len(self.counts))
+
+    def get_board(self):
+        '''
+        Builds the same list as Board.get_board straight from the planes.
+        :return: List of False, "f", "*" or 0-8 for every vertex.
+        '''
+        board = []
+        append = board.append
+        for mine, count, revealed, flagged in zip(self.mines, self.counts, self.revealed, self.flagged):
+            if not revealed:
+                append("f" if flagged else False)
+            elif mine:
+                append("*")
+            else:
+                append(count)
+        return board
+
+
+class MappedPlanes(FieldPlanes):
+
+    def __init__(self, r, c, path, mode="classic", difficulty="custom", total=0, seed=None, deferred=False):
+        '''
+        Creates a new, empty board file and maps it
+        :param path: File to keep the board in, replaced if it exists
+        :param total: Number of mines the board will have
+        :param seed: Seed the mines are laid from, or None
+        :param deferred: True if the mines are laid on the first reveal
+        '''
+        with open(path, "w+b") as f:
+            f.write(MAPPED_HEADER.pack(MAPPED_MAGIC, r, c, mode.encode(), difficulty.encode(), 0, 0, 0, 0, 0, 0))
+            f.truncate(MAPPED_SIZE + 4 * r * c)
+        self.__map(path, False)
+        self.set_layout(total, seed, deferred, None)
+
+    @classmethod
+    def attach(cls, path, readonly=False):
+        '''
+        Maps an existing board file
+        :param readonly: Map the file read-only, the planes can't be written
+        :return: MappedPlanes
+        '''
+        planes = cls.__new__(cls)
+        planes.__map(path, readonly)
+        return planes
+
+    def __map(self, path, readonly):
+        self.path = path
+        self.readonly = readonly
+        with open(path, "rb" if readonly else "r+b") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+
+        magic, self.r, self.c = MAPPED_HEADER.unpack_from(self.mmap)[:3]
+        if magic != MAPPED_MAGIC:
+            raise ValueError(f"{path} is not a board file")
+
+        # Each plane is a window onto the file
+        n = self.r * self.c
+        view = memoryview(self.mmap)
+        self.mines = view[MAPPED_SIZE:MAPPED_SIZE + n]
+        self.counts = view[MAPPED_SIZE + n:MAPPED_SIZE + 2 * n]
+        self.revealed = view[MAPPED_SIZE + 2 * n:MAPPED_SIZE + 3 * n]
+        self.flagged = view[MAPPED_SIZE + 3 * n:MAPPED_SIZE + 4 * n]
+
+    def __getstate__(self):
+        # The mapping can't be pickled, but the file can be attached again
+        self.flush()
+        return {"path": self.path, "readonly": self.readonly}
+
+    def __setstate__(self, state):
+        self.__map(state["path"], state["readonly"])
+
+    def __header(self):
+        return list(MAPPED_HEADER.unpack_from(self.mmap))
+
+    @property
+    def mode(self):
+        return self.__header()[3].rstrip(b"\0").decode()
+
+    @property
+    def difficulty(self):
+        return self.__header()[4].rstrip(b"\0").decode()
+
+    @property
+    def counter(self):
+        return self.__header()[5]
+
+    @property
+    def flags(self):
+        return self.__header()[6]
+
+    @property
+    def total(self):
+        '''
+        :return: Number of mines the board has, laid or not
+        '''
+        header = self.__header()
+        if header[9] & LAYOUT_STORED:
+            return header[7]
+        return len(self.mines) - bytes(self.mines).count(0)
+
+    @property
+    def seed(self):
+        header = self.__header()
+        return header[8] if header[9] & LAYOUT_SEED else None
+
+    @property
+    def deferred(self):
+        return bool(self.__header()[9] & LAYOUT_DEFERRED)
+
+    @property
+    def first(self):
+        # The loc of the first click of a deferred board, None until it is made.
+        header = self.__header()
+        return divmod(header[10], self.c) if header[9] & LAYOUT_FIRST else None
+
+    def set_layout(self, total, seed, deferred, first):
+        # Keeps what the mines are laid from in the header.
+        header = self.__header()
+        layout = LAYOUT_STORED
+        if deferred:
+            layout |= LAYOUT_DEFERRED
+        if seed is not None:
+            layout |= LAYOUT_SEED
+        if first is not None:
+            layout |= LAYOUT_FIRST
+        # The first click is kept as a flat index, which fits any side that does
+        header[7:11] = total, seed or 0, layout, first[0] * self.c + first[1] if first else 0
+        MAPPED_HEADER.pack_into(self.mmap, 0, *header)
+
+    def set_progress(self, counter, flags):
+        # Keeps the timer counter and number of flags in the header.
+        header = self.__header()
+        header[5:7] = counter, flags
+        MAPPED_HEADER.pack_into(self.mmap, 0, *header)
+
+    def flush(self):
+        # Writes the changes back to the file (msync).
+        if not self.readonly:
+            self.mmap.flush()
@@ -0,0 +1,271 @@
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+'''
+The ProbabilityEngine works out the chance of a mine under every covered field,
+from what the player can see.
+
+Covered fields next to a revealed number make up the frontier. The numbers
+tie frontier fields together, and fields that share no number, even through
+other fields, can be counted apart. So the frontier is split into components,
+and every mine layout of a component that fits its numbers is enumerated:
+
+- the fields are walked in breadth-first order, trying each as safe and mined
+- a branch stops as soon as a number can no longer be met
+- the layouts of the rest of the walk only depend on how many mines the
+  numbers still spanning it need, so layouts that agree on those are merged
+
+A component's result is, per number of mines, the number of layouts and how
+many of them have a mine on each field. Components are the same after a
+click on the far side of the board, so results are cached by the
+component's fields and numbers. Components that are not cached are
+enumerated on a process pool.
+
+Covered fields away from the frontier are interior. With m mines on the
+frontier, the rest are spread over the interior fields in comb(interior,
+total - m) ways. That weight combines the components into exact chances.
+
+Like the Solver, flags are the player's guesses, so flagged fields count as
+covered.
+'''
+
+# Components smaller than this are quicker to enumerate than to send to a process
+PARALLEL = 16
+
+
+def enumerate_component(cells, constraints):
+    '''
+    Counts the mine layouts of one component
+    :param cells: Number of fields in the component
+    :param constraints: Tuple of (field indices, mines) per number
+    :return: Dict of mines:(layouts, layouts with a mine per field)
+    '''
+    touching = [[] for i in range(cells)]
+    for k, (members, mines) in enumerate(constraints):
+        for i in members:
+            touching[i].append(k)
+    first = [min(members) for members, mines in constraints]
+    last = [max(members) for members, mines in constraints]
+    # The numbers with fields on both sides of step i, the only state the rest depends on
+    spanning = [
+        tuple(k for k in range(len(constraints)) if first[k] < i <= last[k])
+        for i in range(cells + 1)
+    ]
+    left = [len(members) for members, mines in constraints]
+
+    # Walks the fields in order, one step at a time rather than recursing per
+    # field, so big components don't run out of stack. Layouts that leave the
+    # spanning numbers needing the same mines are merged, as the rest of the
+    # walk can't tell them apart.
+    states = {(): {0: (1, [])}}
+    for i in range(cells):
+        for k in touching[i]:
+            left[k] -= 1
+
+        following = {}
+        for key, result in states.items():
+            need = dict(zip(spanning[i], key))
+            for mine in (0, 1):
+                fits = True
+                after = {}
+                for k in touching[i]:
+                    # Numbers start needing all their mines at their first field
+                    n = need.get(k, constraints[k][1]) - mine
+                    if not 0 <= n <= left[k]:
+                        fits = False
+                        break
+                    after[k] = n
+                if not fits:
+                    continue
+
+                target = following.setdefault(tuple(after.get(k, need.get(k)) for k in spanning[i + 1]), {})
+                for m, (ways, counts) in result.items():
+                    counts = counts + [ways * mine]
+                    m += mine
+                    if m in target:
+                        w, c = target[m]
+                        target[m] = (w + ways, [a + b for a, b in zip(c, counts)])
+                    else:
+                        target[m] = (ways, counts)
+        states = following
+
+    return states.get((), {})
+
+
+def convolve(a, b):
+    # Combines two dicts of mines:layouts into one for both together.
+    result = {}
+    for m, x in a.items():
+        for n, y in b.items():
+            result[m + n] = result.get(m + n, 0) + x * y
+    return result
+
+
+class ProbabilityEngine:
+
+    def __init__(self, workers=None, cache_size=4096):
+        '''
+        :param workers: Processes to enumerate components on, 0 to stay in this process
+        :param cache_size: Number of component results to keep
+        '''
+        self.workers = os.cpu_count() if workers is None else workers
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.__pool = None
+
+    def close(self):
+        # Stops the process pool, if one was started.
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def components(self, graph, visible):
+        '''
+        Splits the frontier into components that can be counted apart
+        :param graph: k:v store of vertex:edges, such as Board.graph
+        :param visible: Dict of loc:value as the player sees it
+        :return: (components, interior, mines found) where a component is a
+                 (fields, constraints) signature as enumerate_component takes,
+                 with the fields as a tuple of locs
+        '''
+        covered = {loc for loc, value in visible.items() if value is False or value == "f"}
+        found = sum(1 for value in visible.values() if value == "*")
+
+        # Each number as (covered fields, mines left), and the numbers per field
+        numbers = {}
+        index = {}
+        for loc, value in visible.items():
+            if value is False or value == "f" or value == "*":
+                continue
+            unknown = []
+            for e in graph[loc]:
+                if e in covered:
+                    unknown.append(e)
+                elif visible.get(e) == "*":
+                    value -= 1
+            if unknown:
+                numbers[loc] = (unknown, value)
+                for e in unknown:
+                    index.setdefault(e, []).append(loc)
+
+        components = []
+        seen = set()
+        for start in sorted(index):
+            if start in seen:
+                continue
+            # Breadth-first, so the numbers spanning each step stay few
+            order = []
+            used = []
+            queue = deque([start])
+            seen.add(start)
+            while queue:
+                loc = queue.popleft()
+                order.append(loc)
+                for key in index[loc]:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    used.append(key)
+                    for e in sorted(numbers[key][0]):
+                        if e not in seen:
+                            seen.add(e)
+                            queue.append(e)
+            position = {loc: i for i, loc in enumerate(order)}
+            constraints = tuple(sorted(
+                (tuple(sorted(position[e] for e in numbers[key][0])), numbers[key][1])
+                for key in used
+            ))
+            components.append((tuple(order), constraints))
+
+        interior = len(covered) - len(index)
+        return components, interior, found
+
+    def __enumerate(self, signatures):
+        # Results for each signature, from the cache or freshly enumerated.
+        results = [self.cache.get(signature) for signature in signatures]
+        todo = [i for i, result in enumerate(results) if result is None]
+        self.hits += len(signatures) - len(todo)
+        self.misses += len(todo)
+
+        big = [i for i in todo if len(signatures[i][0]) >= PARALLEL]
+        if self.workers and len(big) > 1:
+            if self.__pool is None:
+                self.__pool = ProcessPoolExecutor(self.workers)
+            futures = {i: self.__pool.submit(enumerate_component, len(signatures[i][0]), signatures[i][1]) for i in big}
+        else:
+            futures = {}
+
+        for i in todo:
+            if i in futures:
+                results[i] = futures[i].result()
+            else:
+                results[i] = enumerate_component(len(signatures[i][0]), signatures[i][1])
+            self.cache[signatures[i]] = results[i]
+
+        for signature in signatures:
+            self.cache.move_to_end(signature)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return results
+
+    def probabilities(self, graph, visible, total):
+        '''
+        Works out the chance of a mine under every covered field
+        :param graph: k:v store of vertex:edges, such as Board.graph
+        :param visible: Dict of loc:value as the player sees it
+        :param total: Total number of mines on the board
+        :return: Dict of loc:chance for every covered field, empty if no layout fits
+        '''
+        components, interior, found = self.components(graph, visible)
+        results = self.__enumerate(components)
+        total -= found
+
+        # Layouts per number of frontier mines, of all components before and after each one
+        ways = [{m: w for m, (w, counts) in result.items()} for result in results]
+        before = [{0: 1}]
+        for w in ways:
+            before.append(convolve(before[-1], w))
+        after = [{0: 1}]
+        for w in reversed(ways):
+            after.append(convolve(after[-1], w))
+        after.reverse()
+
+        def spread(m):
+            # Ways to put the mines the frontier doesn't hold in the interior
+            return comb(interior, total - m) if 0 <= total - m else 0
+
+        weight = sum(w * spread(m) for m, w in before[-1].items())
+        # Guard: Nothing fits what the player can see
+        if not weight:
+            return {}
+
+        chances = {}
+        for j, ((cells, constraints), result) in enumerate(zip(components, results)):
+            others = convolve(before[j], after[j + 1])
+            tally = [0] * len(cells)
+            for m, (w, counts) in result.items():
+                factor = sum(o * spread(m + n) for n, o in others.items())
+                for i, count in enumerate(counts):
+                    tally[i] += count * factor
+            for loc, count in zip(cells, tally):
+                chances[loc] = count / weight
+
+        if interior:
+            mines = sum(w * spread(m) * (total - m) for m, w in before[-1].items())
+            chance = mines / (weight * interior)
+            for loc, value in visible.items():
+                if (value is False or value == "f") and loc not in chances:
+                    chances[loc] = chance
+        return chances
+
+    def from_board(self, board):
+        '''
+        Works out the chances for everything the player can see on a board
+        :return: Dict of loc:chance for every covered field
+        '''
+        visible = {divmod(i, board.c): value for i, value in enumerate(board.get_board())}
+        return self.probabilities(board.graph, visible, board.get_total_number_of_mines())
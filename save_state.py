@@ -1,6 +1,188 @@
-import sys, os, pickle
+import sys, os, pickle, struct, threading
+from board import Board, MODES, DIFFICULTIES
+from planes import MAPPED_MAGIC
 
 FNAME = ".save"
+LOG = FNAME + ".log"
+
+'''
+Boards are saved in a compact binary format:
+
+- a header: magic, version, mode, difficulty, engine, rows, columns,
+  timer counter and number of flags
+- the mine, revealed and flag planes, packed 8 fields to a byte
+- the board ID, if the board has one
+
+The counts and the graph are worked out again on load.
+Anything else passed to save() is pickled, and older pickled saves still load.
+
+Boards made with engine="mmap" at path FNAME already live in the savefile,
+so saving one only flushes the mapping, and loading attaches to it.
+
+Between snapshots, each move is appended to a journal next to the savefile as
+one (op, row, col, counter) record. Moves change the board and write their
+record under journal_lock. load() replays the journal onto the
+snapshot, and compact() folds it into a new snapshot. Ops set a field to a
+state rather than toggle it, so replaying a move twice changes nothing.
+
+Boards whose mines are not laid yet are saved as just their board ID, as
+the ID builds the same board again, unless they have flags on them.
+'''
+
+MAGIC = b"PMSW"
+VERSION = 2
+HEADER = struct.Struct("<4sBBBBIIII")
+ID_MAGIC = b"PMSI"
+
+ENGINES = ("fields", "array", "mmap")
+
+RECORD = struct.Struct("<BIII")
+REVEAL = 1
+FLAG_ON = 2
+FLAG_OFF = 3
+
+# Held by a move while it changes the board and writes to the journal, and
+# while compacting, so a snapshot never holds half a move that the journal
+# doesn't have yet. Reentrant, as a move holds it around log_move.
+journal_lock = threading.RLock()
+
+# Tables for bytes.translate between 0/1 bytes and "0"/"1" characters
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def pack_plane(plane):
+    # Packs a plane of 0/1 bytes into bits, field i in bit i.
+    digits = bytes(plane).translate(_TO_DIGITS)[::-1]
+    return int(digits or b"0", 2).to_bytes((len(plane) + 7) // 8, "little")
+
+
+def unpack_plane(data, n):
+    # Unpacks n fields from bits back into a plane of 0/1 bytes.
+    digits = format(int.from_bytes(data, "little"), f"0{n}b")[::-1][:n]
+    return digits.encode().translate(_FROM_DIGITS)
+
+
+def encode_board(board, counter=0, flags=0):
+    '''
+    Encodes a board in the binary save format
+    :return: bytes
+    '''
+    header = HEADER.pack(
+        MAGIC, VERSION,
+        MODES.index(board.mode),
+        DIFFICULTIES.index(board.difficulty),
+        ENGINES.index(board.engine),
+        board.r, board.c, counter, flags
+    )
+    planes = b"".join(pack_plane(plane) for plane in board.get_planes())
+    return header + planes + (board.board_id or "").encode()
+
+
+def decode_board(data):
+    '''
+    Decodes a board from the binary save format
+    :return: Save dict of board, counter and flags
+    '''
+    magic, version, mode, difficulty, engine, r, c, counter, flags = HEADER.unpack_from(data)
+    # Guard: A damaged header can name a mode, difficulty or engine that doesn't exist
+    if mode >= len(MODES) or difficulty >= len(DIFFICULTIES) or engine >= len(ENGINES):
+        raise ValueError("Damaged save header")
+    n = r * c
+    size = (n + 7) // 8
+    planes = []
+    for i in range(3):
+        start = HEADER.size + i * size
+        planes.append(unpack_plane(data[start:start + size], n))
+    engine = ENGINES[engine]
+    if engine == "mmap":
+        # A copy of a mapped board is loaded into memory
+        engine = "array"
+    board_id = data[HEADER.size + 3 * size:].decode() if version >= 2 else ""
+    board = Board.from_planes(DIFFICULTIES[difficulty], MODES[mode], r, c, *planes, engine=engine, board_id=board_id)
+    return {
+        "board": board,
+        "counter": counter,
+        "flags": flags
+    }
+
+
+def write_atomic(data):
+    # Writes to a temporary file first, so a crash never leaves half a save.
+    tmp = FNAME + ".tmp"
+    with open(tmp, "wb") as outfile:
+        outfile.write(data)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmp, FNAME)
+
+
+def save_board(board, counter, flags):
+    # Writes the board to the savefile in the binary format.
+    write_atomic(encode_board(board, counter, flags))
+
+
+def log_move(op, loc, counter):
+    # Appends one move to the journal.
+    with journal_lock:
+        with open(LOG, "ab") as log:
+            log.write(RECORD.pack(op, loc[0], loc[1], counter))
+
+
+def is_mapped(board):
+    # True if the board is kept in the savefile itself.
+    return board.engine == "mmap" and os.path.abspath(board.fields.path) == os.path.abspath(FNAME)
+
+
+def compact(board, counter, flags):
+    # Writes a new snapshot of the board, and empties the journal it replaces.
+    with journal_lock:
+        if is_mapped(board):
+            board.fields.set_progress(counter, flags)
+            board.fields.flush()
+        elif board.mines_laid or board.board_id is None or 1 in board.get_planes()[2]:
+            save_board(board, counter, flags)
+        else:
+            # Nothing is decided before the mines are laid and flags are placed, but the board ID
+            write_atomic(ID_MAGIC + board.board_id.encode())
+        open(LOG, "wb").close()
+
+
+def load_mapped():
+    # Attaches to a board kept in the savefile.
+    board = Board.attach(FNAME)
+    return {
+        "board": board,
+        "counter": board.fields.counter,
+        "flags": board.fields.flags
+    }
+
+
+def replay(save_obj):
+    '''
+    Applies the moves in the journal to a loaded snapshot
+    :param save_obj: Save dict of board, counter and flags
+    :return: The same save dict
+    '''
+    try:
+        with open(LOG, "rb") as log:
+            data = log.read()
+    except FileNotFoundError:
+        return save_obj
+
+    board = save_obj["board"]
+    # Ignore a record that was only partly written
+    end = len(data) - len(data) % RECORD.size
+    for op, row, col, counter in RECORD.iter_unpack(data[:end]):
+        if op == REVEAL:
+            board.reveal_delta((row, col))
+        else:
+            board.get_field((row, col)).set_flag(op == FLAG_ON)
+        save_obj["counter"] = max(save_obj["counter"], counter)
+
+    save_obj["flags"] = board.get_board().count("f")
+    return save_obj
+
 
 def save(object):
     # Serialises and writes the object to a savefile.
@@ -16,20 +198,31 @@ def load():
     # Gets savefile, deserialises it and returns the object.
     try:
         infile = open(FNAME, "rb")
-        board = pickle.load(infile, encoding='bytes')
+        if infile.read(len(MAPPED_MAGIC)) == MAPPED_MAGIC:
+            infile.close()
+            return replay(load_mapped())
+        infile.seek(0)
+        data = infile.read()
         infile.close()
+        if data.startswith(MAGIC):
+            return replay(decode_board(data))
+        if data.startswith(ID_MAGIC):
+            board = Board.from_id(data[len(ID_MAGIC):].decode())
+            return replay({"board": board, "counter": 0, "flags": 0})
+        board = pickle.loads(data, encoding='bytes')
         return board
     except FileNotFoundError:
         print("No save file yet.")
         return False
-    except pickle.UnpicklingError:
+    except (pickle.UnpicklingError, struct.error, ValueError):
         print("Unable to read save.")
         return False
 
 def destroy():
-    try:
-        os.remove(FNAME)
-    except FileNotFoundError:
-        pass
+    for path in (FNAME, LOG):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
 
@@ -19,10 +19,16 @@ class Scores:
             points SMALLINT NOT NULL,
             name VARCHAR(24) NOT NULL,
             mode VARCHAR(16) NOT NULL,
-            difficulty VARCHAR(32) NOT NULL
+            difficulty VARCHAR(32) NOT NULL,
+            board_id VARCHAR(32)
         );
         ''')
 
+        # Tables made before board IDs lack the column
+        columns = [row[1] for row in self.__query_table("PRAGMA table_info(Scores)")]
+        if "board_id" not in columns:
+            self.__query_table("ALTER TABLE Scores ADD COLUMN board_id VARCHAR(32)")
+
 
     def __connect(self, path):
         '''
@@ -104,10 +110,11 @@ class Scores:
             """)
 
 
-    def write_highscore(self, name, points, mode, difficulty):
+    def write_highscore(self, name, points, mode, difficulty, board_id=None):
         '''
         Accepts high score dict
         :param new_score: {name: "", difficulty: "", points: 0}
+        :param board_id: ID of the board the score was set on, if it has one
         :return: successful(Bool)
         '''
 
@@ -125,9 +132,9 @@ class Scores:
             return False
 
         self.__query_table(f"""
-            INSERT INTO Scores
-            VALUES (?, ?, ?, ?)
-        """, (points, name, mode, difficulty))
+            INSERT INTO Scores (points, name, mode, difficulty, board_id)
+            VALUES (?, ?, ?, ?, ?)
+        """, (points, name, mode, difficulty, board_id))
 
         return True
 
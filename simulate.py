@@ -0,0 +1,212 @@
+'''
+Plays seeded games without the GUI, to measure generators and solvers.
+
+Every (mode, difficulty) gets the same seeds, so runs can be compared game by
+game. Games are sharded over a process pool and streamed back in chunks as
+they finish, one CSV row or JSON line per game, with a summary per
+(mode, difficulty) on stderr. Games share nothing, so it scales with cores.
+
+Run from the repository root, for example:
+    python simulate.py --games 10000 --policy solver --format json --out games.jsonl
+
+Policies decide where to click:
+- random: any covered field
+- solver: a field the Solver knows is safe, otherwise a random guess
+- probability: like solver, but guesses the field least likely to be mined
+'''
+import argparse, csv, json, os, random, sys, time
+from multiprocessing import Pool
+from board import Board, SETTINGS
+from openings import OpeningIndex
+from solver import Solver
+from probability import ProbabilityEngine
+from noguess import generate_board
+
+FIELDS = ("mode", "difficulty", "seed", "policy", "generator", "won", "bbbv", "clicks", "time")
+
+
+def bbbv(board):
+    '''
+    The 3BV of a board: the fewest clicks that clear it without flags, which
+    is one per opening and one per number outside every opening
+    :return: int
+    '''
+    mines = board.get_planes()[0]
+    counts = board.topology.count(mines)
+    zeros = bytes(0 if m or n else 1 for m, n in zip(mines, counts))
+    openings = OpeningIndex(board.topology, zeros)
+    opened = set()
+    for region in openings.regions:
+        opened.update(region)
+    return len(openings) + sum(1 for i, m in enumerate(mines) if not m and i not in opened)
+
+
+class RandomPolicy:
+    '''
+    Clicks any covered field
+    '''
+
+    def __init__(self, board, rng):
+        self.rng = rng
+        self.covered = [divmod(i, board.c) for i, value in enumerate(board.get_board()) if value is False]
+
+    def update(self, changes):
+        if changes:
+            self.covered = [loc for loc in self.covered if loc not in changes]
+
+    def move(self):
+        return self.rng.choice(self.covered)
+
+
+class SolverPolicy(RandomPolicy):
+    '''
+    Clicks a field the Solver knows is safe, and guesses when there is none
+    '''
+
+    def __init__(self, board, rng):
+        super().__init__(board, rng)
+        self.board = board
+        self.solver = Solver(board.graph, board.get_total_number_of_mines())
+        self.solver.update(board.get_board(), board.c)
+
+    def update(self, changes):
+        super().update(changes)
+        self.solver.update(changes)
+
+    def guess(self, options):
+        return self.rng.choice(options)
+
+    def move(self):
+        loc = self.solver.hint()
+        if loc is not None:
+            return loc
+        options = [loc for loc in self.covered if loc not in self.solver.mines]
+        return self.guess(options)
+
+
+class ProbabilityPolicy(SolverPolicy):
+    '''
+    Like SolverPolicy, but guesses the field least likely to be mined
+    '''
+
+    def __init__(self, board, rng):
+        super().__init__(board, rng)
+        self.engine = ProbabilityEngine(workers=0)
+
+    def guess(self, options):
+        # Guard: Nothing is known before the first click
+        if not self.solver.revealed:
+            return self.rng.choice(options)
+        chances = self.engine.from_board(self.board)
+        return min(options, key=lambda loc: chances.get(loc, 1))
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "solver": SolverPolicy,
+    "probability": ProbabilityPolicy,
+}
+
+
+def play(mode, difficulty, seed, policy="solver", generator="plain"):
+    '''
+    Plays one game
+    :param generator: "plain" for a board whose mines are laid on the first
+                      click, "noguess" for a no-guess board
+    :return: Dict of FIELDS
+    '''
+    start = time.perf_counter()
+    if generator == "noguess":
+        board = generate_board(difficulty, mode, seed)
+    else:
+        board = Board(difficulty, mode, deferred=True, seed=seed)
+    player = POLICIES[policy](board, random.Random(seed))
+
+    total = board.get_total_number_of_mines()
+    left = board.r * board.c - total - sum(1 for value in board.get_board() if value is not False and value != "f")
+    clicks = 0
+    won = left == 0
+    while not won:
+        changes = board.reveal_delta(player.move())
+        clicks += 1
+        if "*" in changes.values():
+            break
+        left -= len(changes)
+        won = left == 0
+        player.update(changes)
+
+    return {
+        "mode": mode,
+        "difficulty": difficulty,
+        "seed": seed,
+        "policy": policy,
+        "generator": generator,
+        "won": won,
+        "bbbv": bbbv(board),
+        "clicks": clicks,
+        "time": time.perf_counter() - start,
+    }
+
+
+def play_task(task):
+    # Pool.imap_unordered passes one argument.
+    return play(*task)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plays seeded games without the GUI.")
+    parser.add_argument("--games", type=int, default=1000, help="games per mode and difficulty")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--modes", nargs="+", default=["classic", "hexagon"], choices=["classic", "hexagon"])
+    parser.add_argument("--difficulties", nargs="+", default=["beginner", "intermediate", "expert"], choices=list(SETTINGS))
+    parser.add_argument("--policy", default="solver", choices=list(POLICIES))
+    parser.add_argument("--generator", default="plain", choices=["plain", "noguess"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=0, help="games per chunk, picked from the games and workers by default")
+    parser.add_argument("--format", default="csv", choices=["csv", "json"], help="csv rows, or one JSON object per line")
+    parser.add_argument("--out", default="-", help="file to write the games to, - for stdout")
+    args = parser.parse_args(argv)
+
+    tasks = [
+        (mode, difficulty, seed, args.policy, args.generator)
+        for mode in args.modes
+        for difficulty in args.difficulties
+        for seed in range(args.seed, args.seed + args.games)
+    ]
+    # Big enough chunks to keep the pipes quiet, small enough to keep every worker busy
+    chunksize = args.chunksize or max(1, len(tasks) // (args.workers * 16))
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    if args.format == "csv":
+        writer = csv.DictWriter(out, FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(result): out.write(json.dumps(result) + "\n")
+
+    summary = {}
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        for result in pool.imap_unordered(play_task, tasks, chunksize):
+            write(result)
+            games, won, bbbv_sum, clicks, seconds = summary.get((result["mode"], result["difficulty"]), (0, 0, 0, 0, 0))
+            summary[(result["mode"], result["difficulty"])] = (
+                games + 1, won + result["won"], bbbv_sum + result["bbbv"],
+                clicks + result["clicks"], seconds + result["time"]
+            )
+    elapsed = time.perf_counter() - start
+    if out is not sys.stdout:
+        out.close()
+
+    print(f"{'mode':<9}{'difficulty':<14}{'games':>8}{'won':>7}{'3bv':>7}{'clicks':>8}{'ms/game':>9}", file=sys.stderr)
+    for (mode, difficulty), (games, won, bbbv_sum, clicks, seconds) in summary.items():
+        print(
+            f"{mode:<9}{difficulty:<14}{games:>8}{won / games:>7.1%}{bbbv_sum / games:>7.1f}"
+            f"{clicks / games:>8.1f}{seconds / games * 1000:>9.2f}",
+            file=sys.stderr
+        )
+    print(f"{len(tasks)} games in {elapsed:.1f}s on {args.workers} workers, {len(tasks) / elapsed:.0f} games/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+from collections import defaultdict
+
+'''
+The Solver works out which covered fields are certainly safe and which are
+certainly mined, from what the player can see.
+
+Every revealed number is a constraint: its covered neighbours hold exactly
+that many mines, less the mines already found around it. Constraints are
+indexed by the covered fields they mention, so when a field is revealed or
+found to be a mine only the constraints that mention it are looked at again.
+
+Two rules are used on a constraint that has changed:
+- single: no mines left means every field is safe, and as many mines as
+  fields means every field is a mine
+- subset: if its fields are all part of another constraint's fields, the
+  rest of that constraint's fields hold the difference in mines
+
+Given the total number of mines, it also uses it once the rules run dry: if
+every mine is found the rest is safe, and if the covered fields left are all
+mines, they are.
+
+It only needs the graph, so it works for classic and hexagon boards alike.
+Flags are the player's guesses, so flagged fields count as covered.
+'''
+
+
+class Solver:
+
+    def __init__(self, graph, total=None):
+        '''
+        :param graph: k:v store of vertex:edges, such as Board.graph
+        :param total: Total number of mines on the board, if known
+        '''
+        self.graph = graph
+        self.total = total
+
+        # loc:value of every revealed field
+        self.revealed = {}
+        # Fields found to be safe that are not revealed yet, and found mines
+        self.safe = set()
+        self.mines = set()
+
+        # loc of a number: [covered unknown fields around it, mines left]
+        self.constraints = {}
+        # Covered field: locs of the constraints it is part of
+        self.index = defaultdict(set)
+        # Constraints to look at again
+        self.dirty = set()
+
+    @classmethod
+    def from_board(cls, board):
+        # A solver that has seen everything the player can see on the board.
+        solver = cls(board.graph, board.get_total_number_of_mines())
+        solver.update(board.get_board(), board.c)
+        return solver
+
+    def update(self, changes, c=None):
+        '''
+        Tells the solver what the player can now see.
+        :param changes: Dict of loc:value, as from Board.reveal_delta, or the
+                        whole list from Board.get_board with c
+        :param c: Number of columns, when passing the whole board
+        '''
+        if c is not None:
+            changes = {divmod(i, c): value for i, value in enumerate(changes)}
+
+        for loc, value in changes.items():
+            if value is False or value == "f" or loc in self.revealed:
+                continue
+            self.revealed[loc] = value
+            self.safe.discard(loc)
+            if value == "*":
+                self.mines.add(loc)
+                self.__forget(loc, True)
+            else:
+                self.__forget(loc)
+                self.__add(loc, value)
+        self.solve()
+
+    def __add(self, loc, value):
+        # Adds the constraint of a newly revealed number.
+        unknown = set()
+        for e in self.graph[loc]:
+            if e in self.mines:
+                value -= 1
+            elif e not in self.revealed and e not in self.safe:
+                unknown.add(e)
+        self.constraints[loc] = [unknown, value]
+        for e in unknown:
+            self.index[e].add(loc)
+        self.dirty.add(loc)
+
+    def __forget(self, loc, mine=False):
+        # Takes a field that is no longer unknown out of every constraint.
+        for key in self.index.pop(loc, ()):
+            constraint = self.constraints[key]
+            constraint[0].discard(loc)
+            if mine:
+                constraint[1] -= 1
+            self.dirty.add(key)
+
+    def __mark(self, cells, mine):
+        for loc in cells:
+            if loc in self.mines or loc in self.safe or loc in self.revealed:
+                continue
+            if mine:
+                self.mines.add(loc)
+            else:
+                self.safe.add(loc)
+            self.__forget(loc, mine)
+
+    def solve(self):
+        '''
+        Applies the rules until nothing more can be worked out
+        :return: (safe, mines) sets of everything found so far
+        '''
+        while self.dirty:
+            key = self.dirty.pop()
+            constraint = self.constraints.get(key)
+            if constraint is None:
+                continue
+            unknown, left = constraint
+
+            # Guard: Constraints with no unknown fields left are done
+            if not unknown:
+                del self.constraints[key]
+                continue
+
+            # Single rules
+            if left == 0:
+                self.__mark(list(unknown), False)
+                continue
+            if left == len(unknown):
+                self.__mark(list(unknown), True)
+                continue
+
+            # Subset rules, against the constraints sharing a field with this one
+            others = set()
+            for loc in unknown:
+                others |= self.index[loc]
+            others.discard(key)
+            for other in others:
+                if other not in self.constraints:
+                    continue
+                o_unknown, o_left = self.constraints[other]
+                if unknown <= o_unknown:
+                    small, big, rest = unknown, o_unknown, o_left - left
+                elif o_unknown <= unknown:
+                    small, big, rest = o_unknown, unknown, left - o_left
+                else:
+                    continue
+                extra = big - small
+                if not extra:
+                    continue
+                if rest == 0:
+                    self.__mark(list(extra), False)
+                elif rest == len(extra):
+                    self.__mark(list(extra), True)
+                else:
+                    continue
+                # The constraints changed under us, look at this one again
+                self.dirty.add(key)
+                break
+
+        # Count rule, only worth the walk over the board when stuck
+        if self.total is not None and not self.safe:
+            left = self.total - len(self.mines)
+            covered = [loc for loc in self.graph if loc not in self.revealed and loc not in self.mines]
+            if left == 0:
+                self.__mark(covered, False)
+            elif left == len(covered):
+                self.__mark(covered, True)
+            if self.dirty:
+                return self.solve()
+        return self.safe, self.mines
+
+    def hint(self):
+        '''
+        :return: A covered loc that is certainly safe, None if there is none
+        '''
+        for loc in self.safe:
+            return loc
+        return None
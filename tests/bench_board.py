@@ -0,0 +1,187 @@
+'''
+Benchmark: the Board hot paths across board sizes, densities, modes and engines.
+
+Each case times, on a fresh board:
+- init: Board.__init__ of a deferred board, so without laying mines
+- lay_mines
+- count_mines
+- graph: looking up the edges of every field in Board.graph, which replaced
+  the graph dictionary that __init__ used to build
+- reveal: reveal_delta on the first 0, found before the timing starts
+- get_board
+
+Times are the best of a few runs. Peak memory of each step comes from one
+more run under tracemalloc, kept apart so tracing doesn't skew the times.
+
+Results are written as JSON with --out. With --baseline, they are compared
+to an earlier run: any step that got slower or bigger by more than the
+tolerance is reported, and the run exits with status 1.
+
+Run from the repository root:
+    python tests/bench_board.py [--quick] [--out results.json] [--baseline baseline.json]
+'''
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from board import Board
+
+SIZES = ((8, 10), (100, 100), (500, 500), (2000, 2000))
+QUICK_SIZES = ((8, 10), (100, 100))
+DENSITIES = (0.1, 0.2)
+MODES = ("classic", "hexagon")
+ENGINES = ("fields", "array")
+STEPS = ("init", "lay_mines", "count_mines", "graph", "reveal", "get_board")
+
+# Differences below these are noise, whatever the tolerance
+NOISE_SECONDS = 0.002
+NOISE_BYTES = 64 * 1024
+
+
+def first_zero(board):
+    # The first field with no mine near it, for reveal to open.
+    planes = board.get_planes()[0]
+    counts = board.topology.count(planes)
+    for i, (m, n) in enumerate(zip(planes, counts)):
+        if not m and not n:
+            return divmod(i, board.c)
+
+
+def steps(r, c, density, mode, engine):
+    '''
+    The steps of a case, each run on the board the steps before it made
+    :return: List of (step, function, prepare) where each function takes the
+             board so far, and the result of prepare on it if there is one.
+             prepare runs outside the timing.
+    '''
+    mines = int(r * c * density)
+
+    def init(board): return Board((r, c, mines), mode, engine, deferred=True, seed=1)
+    def lay(board): board.lay_mines(mines, seed=1)
+    def count(board): board.count_mines()
+
+    def graph(board):
+        for loc in board.graph:
+            board.graph[loc]
+
+    def reveal(board, loc):
+        if loc is not None:
+            board.reveal_delta(loc)
+
+    def get_board(board): board.get_board()
+
+    prepare = {"reveal": first_zero}
+    return [
+        (step, fn, prepare.get(step))
+        for step, fn in zip(STEPS, (init, lay, count, graph, reveal, get_board))
+    ]
+
+
+def run_step(fn, prepare, board):
+    # Runs prepare, then returns a call of fn for the timing to wrap.
+    if prepare is None:
+        return lambda: fn(board)
+    arg = prepare(board)
+    return lambda: fn(board, arg)
+
+
+def run_case(r, c, density, mode, engine, repeat):
+    # Best time and peak memory of every step of one case.
+    best = dict.fromkeys(STEPS, float("inf"))
+    for i in range(repeat):
+        board = None
+        for step, fn, prepare in steps(r, c, density, mode, engine):
+            call = run_step(fn, prepare, board)
+            start = time.perf_counter()
+            result = call()
+            best[step] = min(best[step], time.perf_counter() - start)
+            if step == "init":
+                board = result
+
+    peak = {}
+    board = None
+    tracemalloc.start()
+    for step, fn, prepare in steps(r, c, density, mode, engine):
+        call = run_step(fn, prepare, board)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = call()
+        peak[step] = tracemalloc.get_traced_memory()[1] - before
+        if step == "init":
+            board = result
+    tracemalloc.stop()
+
+    return [
+        {
+            "mode": mode, "engine": engine, "rows": r, "cols": c, "density": density,
+            "step": step, "seconds": best[step], "peak_bytes": peak[step]
+        }
+        for step in STEPS
+    ]
+
+
+def key(result):
+    return (result["mode"], result["engine"], result["rows"], result["cols"], result["density"], result["step"])
+
+
+def compare(results, baseline, tolerance):
+    '''
+    :return: List of lines describing every regression against the baseline
+    '''
+    before = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        name = "{} {} {}x{} {:.0%} {}".format(*key(result)[:3], result["cols"], result["density"], result["step"])
+        for field, noise in (("seconds", NOISE_SECONDS), ("peak_bytes", NOISE_BYTES)):
+            new_value, old_value = result[field], old[field]
+            if new_value - old_value > noise and new_value > old_value * (1 + tolerance):
+                regressions.append(f"{name}: {field} {old_value:.6g} -> {new_value:.6g}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the Board hot paths.")
+    parser.add_argument("--quick", action="store_true", help=f"only sizes up to {QUICK_SIZES[-1][0]}x{QUICK_SIZES[-1][1]}")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case on boards under a million fields")
+    parser.add_argument("--out", help="file to write the results to as JSON")
+    parser.add_argument("--baseline", help="results of an earlier run to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="share a step may get worse by before it fails")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'mode':<9}{'engine':<8}{'size':>11}{'density':>9}  " + "".join(f"{step:>13}" for step in STEPS))
+    for mode in args.modes:
+        for engine in args.engines:
+            for r, c in QUICK_SIZES if args.quick else SIZES:
+                for density in DENSITIES:
+                    repeat = args.repeat if r * c < 1000000 else 1
+                    case = run_case(r, c, density, mode, engine, repeat)
+                    results += case
+                    times = "".join(f"{result['seconds'] * 1000:>11.2f}ms" for result in case)
+                    print(f"{mode:<9}{engine:<8}{f'{r}x{c}':>11}{density:>9.0%}  {times}", flush=True)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} REGRESSIONS against {args.baseline}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+'''
+Benchmark: memory per field for each way of storing a board.
+
+Run from the repository root:
+    python tests/bench_field.py
+'''
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import tracemalloc
+from field import Field, PackedFields
+from planes import FieldPlanes
+
+SIZE = (200, 200)
+
+
+class DictField:
+    # The Field before packing: a __dict__ holding value, flag and revealed.
+    def __init__(self):
+        self.value = 0
+        self.flag = False
+        self.revealed = False
+
+
+def dict_of(cls):
+    return lambda r, c: {(row, col): cls() for row in range(r) for col in range(c)}
+
+
+def measure(build):
+    # Bytes allocated per field to build a whole board's store.
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build(*SIZE)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / (SIZE[0] * SIZE[1])
+
+
+def main():
+    stores = (
+        ("dict of __dict__ Fields", dict_of(DictField)),
+        ("dict of packed Fields", dict_of(Field)),
+        ("PackedFields", PackedFields),
+        ("FieldPlanes", FieldPlanes),
+    )
+    print(f"Memory per field on a {SIZE[0]}x{SIZE[1]} board")
+    for name, build in stores:
+        print(f"{name:<26}{measure(build):>8.1f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+'''
+Benchmark: Board.lay_mines against the old rejection-sampling loop.
+
+Run from the repository root:
+    python tests/bench_mines.py
+'''
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import random
+import timeit
+from board import Board
+
+SIZE = (100, 100)
+DENSITIES = (0.1, 0.25, 0.5, 0.75, 0.9)
+REPEAT = 5
+
+
+def rejection_loop(board, qty):
+    # The previous lay_mines: retry random locations until qty mines are down.
+    def rand_loc(): return (random.randint(0, board.r - 1), random.randint(0, board.c - 1))
+
+    while qty != 0:
+        field = board.get_field(rand_loc())
+        if not field.is_mined:
+            field.set_mine()
+            qty -= 1
+
+
+def time_lay(lay, engine, qty):
+    # Best of REPEAT runs, each on a fresh, unmined board.
+    best = None
+    for i in range(REPEAT):
+        b = Board((SIZE[0], SIZE[1], 0), engine=engine)
+        t = timeit.timeit(lambda: lay(b, qty), number=1)
+        best = t if best is None else min(best, t)
+    return best
+
+
+def main():
+    cells = SIZE[0] * SIZE[1]
+    print(f"lay_mines on a {SIZE[0]}x{SIZE[1]} board, best of {REPEAT} (ms)")
+    print(f"{'engine':<8}{'density':>8}{'loop':>10}{'sample':>10}{'speedup':>10}")
+    for engine in ("fields", "array"):
+        for density in DENSITIES:
+            qty = int(cells * density)
+            old = time_lay(rejection_loop, engine, qty)
+            new = time_lay(lambda b, q: b.lay_mines(q), engine, qty)
+            print(f"{engine:<8}{density:>8.0%}{old * 1000:>10.2f}{new * 1000:>10.2f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+'''
+Benchmark: boards solved per second by the Solver.
+
+Each board is opened on a random 0, then the solver reveals every field it
+finds safe until it runs out. A board counts as solved if that clears it
+without a guess.
+
+Run from the repository root:
+    python tests/bench_solver.py [boards]
+'''
+import sys, os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import random
+import time
+from board import Board
+from solver import Solver
+
+
+def play(board, rng):
+    # Plays one board with the solver. Returns True if it was cleared.
+    zeros = [loc for loc in board.fields if board.get_value(loc) == 0]
+    if not zeros:
+        return False
+    solver = Solver(board.graph, board.get_total_number_of_mines())
+    solver.update(board.reveal_delta(rng.choice(zeros)))
+    while solver.safe:
+        for loc in list(solver.safe):
+            solver.update(board.reveal_delta(loc))
+    return len(solver.revealed) + board.get_total_number_of_mines() == board.r * board.c
+
+
+def main():
+    boards = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    print(f"{'mode':<9}{'difficulty':<14}{'boards/s':>10}{'solved':>9}")
+    for mode in ("classic", "hexagon"):
+        for difficulty in ("beginner", "intermediate", "expert"):
+            games = [Board(difficulty, mode) for i in range(boards)]
+            start = time.perf_counter()
+            solved = sum(play(board, rng) for board in games)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:<9}{difficulty:<14}{boards / elapsed:>10.0f}{solved / boards:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import sys
+sys.path.append("..")
+import unittest
+import threading, time
+from autosave import AutoSaver
+
+class testAutoSaver(unittest.TestCase):
+
+    # Generous, as these only bound waits for something that should happen
+    TIMEOUT = 10
+
+    def setUp(self):
+        self.written = []
+        self.active = 0
+        self.most_active = 0
+        self.lock = threading.Lock()
+        self.wrote = threading.Event()
+
+    def write(self, move):
+        # Records each write, and how many were in flight at once.
+        with self.lock:
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+        time.sleep(0.01)
+        self.written.append(move)
+        with self.lock:
+            self.active -= 1
+        self.wrote.set()
+
+    def test_burst(self):
+        # A burst of moves is written once, with the latest state
+        saver = AutoSaver(self.write, quiet=self.TIMEOUT, every=1000)
+        for move in range(100):
+            saver.schedule(move)
+        saver.flush()
+        self.assertEqual([99], self.written)
+        saver.close()
+
+    def test_quiet(self):
+        # A save is written on its own once the moves pause
+        saver = AutoSaver(self.write, quiet=0.05, every=1000)
+        saver.schedule(1)
+        self.assertTrue(self.wrote.wait(self.TIMEOUT))
+        self.assertEqual([1], self.written)
+        saver.close()
+
+    def test_every(self):
+        # Moves that never pause are still written every so often
+        saver = AutoSaver(self.write, quiet=self.TIMEOUT, every=10)
+        for move in range(30):
+            saver.schedule(move)
+            if move % 10 == 9:
+                self.assertTrue(self.wrote.wait(self.TIMEOUT))
+                self.wrote.clear()
+        self.assertEqual([9, 19, 29], self.written)
+
+        # and never overlap, however fast they come
+        for move in range(30, 100):
+            saver.schedule(move)
+        saver.close()
+        self.assertEqual(99, self.written[-1])
+        self.assertEqual(1, self.most_active)
+
+    def test_cancel(self):
+        saver = AutoSaver(self.write, quiet=self.TIMEOUT)
+        saver.schedule(1)
+        saver.cancel()
+        saver.flush()
+        self.assertEqual([], self.written)
+
+        # Flushing writes straight away
+        saver.schedule(2)
+        saver.flush()
+        self.assertEqual([2], self.written)
+        saver.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
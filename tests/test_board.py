@@ -1,6 +1,7 @@
 import sys
 sys.path.append("..")
 import unittest
+import threading
 from board import Board
 
 class testFieldMethods(unittest.TestCase):
@@ -60,6 +61,150 @@ class testFieldMethods(unittest.TestCase):
         # We test for four, because we already layed one down
         self.assertEqual(4, actual.count("*"))
 
+    def test_array_engine(self):
+        # The array engine should play exactly like the Field engine.
+        fields = Board("test")
+        planes = Board("test", engine="array")
+        self.assertEqual(fields.graph, planes.graph)
+
+        for b in (fields, planes):
+            b.get_field((0, 0)).set_mine()
+            b.count_mines()
+            b.reveal((0, 1))
+            b.flag((0, 0))
+            b.reveal((3, 3))
+        self.assertEqual(fields.get_board(), planes.get_board())
+        self.assertEqual(["f", 1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], planes.get_board())
+
+        # Out of bounds locations are not fields
+        self.assertIsNone(planes.get_field((4, 0)))
+        self.assertIsNone(planes.get_field((-1, 0)))
+
+    def test_lay_mines(self):
+        # The same seed lays the same mines
+        a = Board((10, 10, 0), engine="array")
+        b = Board((10, 10, 0), engine="array")
+        a.lay_mines(30, seed=42)
+        b.lay_mines(30, seed=42)
+        self.assertEqual(a.fields.mines, b.fields.mines)
+
+        # Dense boards are filled exactly, on top of existing mines
+        b = Board((10, 10, 0))
+        b.get_field((0, 0)).set_mine()
+        self.assertTrue(b.lay_mines(89))
+        self.assertEqual(90, sum(1 for f in b.fields.values() if f.is_mined))
+
+        # There's no room for more mines than free fields
+        self.assertFalse(b.lay_mines(11))
+
+        # Excluded fields stay clear
+        b = Board((10, 10, 0))
+        self.assertTrue(b.lay_mines(99, exclude=[(5, 5)]))
+        self.assertFalse(b.get_field((5, 5)).is_mined)
+
+        # A single mine is laid too
+        b = Board((4, 4, 1))
+        self.assertEqual(1, b.get_planes()[0].count(1))
+        b = Board((4, 4, 1), deferred=True)
+        b.reveal_delta((0, 0))
+        self.assertEqual(1, b.get_planes()[0].count(1))
+
+    def test_delta(self):
+        for engine in ("fields", "array"):
+            b = Board("test", engine=engine)
+            b.get_field((0, 0)).set_mine()
+            b.count_mines()
+
+            # Flagging touches one field
+            self.assertEqual({(0, 0): "f"}, b.flag_delta((0, 0)))
+            self.assertEqual({(0, 0): False}, b.flag_delta((0, 0)))
+
+            # A number only opens itself
+            self.assertEqual({(1, 1): 1}, b.reveal_delta((1, 1)))
+
+            # A flood fill reports exactly the fields it opened
+            changes = b.reveal_delta((3, 3))
+            self.assertEqual(14, len(changes))
+            self.assertNotIn((1, 1), changes)
+            self.assertNotIn((0, 0), changes)
+            for loc, value in changes.items():
+                self.assertEqual(b.get_board()[loc[0] * b.c + loc[1]], value)
+
+            # Nothing left to open, and hidden flags don't show
+            self.assertEqual({}, b.reveal_delta((3, 3)))
+            self.assertEqual({}, b.flag_delta((3, 3)))
+
+    def test_deferred(self):
+        for engine in ("fields", "array"):
+            for seed in range(10):
+                b = Board("intermediate", "hexagon", engine=engine, deferred=True)
+                self.assertFalse(b.mines_laid)
+                self.assertEqual([False] * (b.r * b.c), b.get_board())
+
+                # The first reveal lays the mines around it, and always opens an area
+                changes = b.reveal_delta((seed, seed))
+                self.assertTrue(b.mines_laid)
+                self.assertEqual(0, changes[(seed, seed)])
+                self.assertGreater(len(changes), 1)
+                mined = sum(1 for loc in b.fields if b.get_value(loc) == "*")
+                self.assertEqual(40, mined)
+
+    def test_deferred_threads(self):
+        # First reveals racing on worker threads lay the mines once
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        for i in range(20):
+            b = Board("intermediate", deferred=True)
+            start = threading.Barrier(4)
+
+            def reveal(loc):
+                start.wait()
+                b.reveal_delta(loc)
+
+            threads = [threading.Thread(target=reveal, args=((row, row),)) for row in range(0, 12, 3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(40, b.get_planes()[0].count(1))
+
+    def test_board_id(self):
+        for mode in ("classic", "hexagon"):
+            for difficulty in ("beginner", (20, 30, 100)):
+                b = Board(difficulty, mode)
+                self.assertEqual(b.get_planes(), Board.from_id(b.board_id).get_planes())
+                self.assertEqual(b.get_planes(), Board(difficulty, mode, seed=b.seed).get_planes())
+
+                # Deferred boards only know their mines once the first click is in the ID
+                b = Board(difficulty, mode, deferred=True)
+                self.assertFalse(Board.from_id(b.board_id).mines_laid)
+                b.reveal_delta((3, 4))
+                self.assertEqual(b.get_planes()[0], Board.from_id(b.board_id).get_planes()[0])
+
+        self.assertEqual(8, len(Board("beginner", seed=1).board_id))
+        self.assertRaises(ValueError, Board.from_id, "not an id")
+
+        # A first click off the board is not an ID either
+        b = Board("beginner", deferred=True, seed=1)
+        b.reveal_delta((3, 4))
+        b.first = (8, 4)
+        self.assertRaises(ValueError, Board.from_id, b.board_id)
+
+        # Custom boards too big for an ID have none
+        self.assertIsNone(Board((70000, 2, 10), deferred=True).board_id)
+
+        # Seeds are kept to the 32 bits an ID has room for
+        b = Board("beginner", seed=2 ** 32 + 7)
+        self.assertEqual(7, b.seed)
+        self.assertEqual(b.get_planes(), Board.from_id(b.board_id).get_planes())
+
+    def test_custom_board(self):
+        b = Board((20, 30, 100), engine="array")
+        self.assertEqual("custom", b.difficulty)
+        self.assertEqual(600, len(b.get_board()))
+        self.assertEqual(100, len(b.fields.mines) - b.fields.mines.count(0))
+
 
 
 
@@ -0,0 +1,66 @@
+import sys
+sys.path.append("..")
+import unittest
+import tempfile
+from chunks import ChunkedBoard
+
+class testChunkedBoard(unittest.TestCase):
+
+    def value(self, board, loc):
+        field = board.get_field(loc)
+        return field.value
+
+    def test_counts_across_chunks(self):
+        # Every count matches the mines around it, along chunk edges too
+        for mode in ("classic", "hexagon"):
+            board = ChunkedBoard(seed=5, density=0.2, mode=mode, size=8)
+            for row in range(-10, 10):
+                for col in range(-10, 10):
+                    if board.get_field((row, col)).is_mined:
+                        continue
+                    mines = sum(1 for loc in board.neighbours((row, col)) if board.get_field(loc).is_mined)
+                    self.assertEqual(mines, self.value(board, (row, col)), (mode, row, col))
+
+    def test_deterministic(self):
+        # Chunks come out the same whatever order they are generated in
+        a = ChunkedBoard(seed="abc", size=8)
+        b = ChunkedBoard(seed="abc", size=8)
+        b.get_field((100, -100))
+        locs = [(row, col) for row in range(-20, 20) for col in range(-20, 20)]
+        self.assertEqual([self.value(a, l) for l in locs], [self.value(b, l) for l in reversed(locs)][::-1])
+        c = ChunkedBoard(seed="abd", size=8)
+        self.assertNotEqual([self.value(a, l) for l in locs], [self.value(c, l) for l in locs])
+
+    def test_reveal_crosses_chunks(self):
+        board = ChunkedBoard(seed=1, density=0.0, size=8, limit=500)
+        # With no mines the opening never ends, so it stops at the limit
+        changes = board.reveal((0, 0))
+        self.assertLessEqual(500, len(changes))
+        self.assertTrue(all(v == 0 for v in changes.values()))
+        self.assertLess(1, len({(r // 8, c // 8) for r, c in changes}))
+        self.assertTrue(board.frontier)
+
+        # Fields already opened are not opened again
+        more = board.expand(100)
+        self.assertFalse(set(more) & set(changes))
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as path:
+            board = ChunkedBoard(seed=2, size=8, max_chunks=2, path=path)
+            board.flag((3, 3))
+            for i in range(1, 5):
+                board.get_field((0, i * 8))
+            self.assertEqual(2, len(board.chunks))
+
+            # The flag survives the chunk being evicted and generated again
+            self.assertEqual("f", board.get_visible((3, 3)))
+            self.assertEqual({(3, 3): False}, board.flag((3, 3)))
+
+            # and so does taking it away, on a second eviction
+            for i in range(1, 5):
+                board.get_field((0, i * 8))
+            self.assertEqual(False, board.get_visible((3, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import sys
 sys.path.append("..")
 import unittest
-from field import Field
+import pickle
+from field import Field, PackedFields
 
 class testFieldMethods(unittest.TestCase):
 
@@ -50,6 +51,45 @@ class testFieldMethods(unittest.TestCase):
         f.reveal()
         self.assertEqual(True, f.revealed)
 
+    def test_packed(self):
+        fields = PackedFields(2, 3)
+        self.assertEqual(6, len(fields))
+        self.assertEqual(6, len(fields.states))
+
+        # Fields write through to the shared state bytes
+        fields[(1, 2)].increment()
+        fields[(1, 2)].set_flag(True)
+        fields[(0, 0)].set_mine()
+        self.assertEqual(1, fields[(1, 2)].value)
+        self.assertTrue(fields[(1, 2)].flag)
+        self.assertTrue(fields[(0, 0)].is_mined)
+        self.assertFalse(fields[(0, 1)].is_mined)
+
+        # Mines and counts are read and written as whole planes
+        fields.set_mines([4])
+        self.assertEqual(b"\x01\x00\x00\x00\x01\x00", fields.get_mines())
+        fields.set_counts(b"\x00\x02\x01\x02\x00\x01")
+        self.assertEqual(["*", 2, 1, 2, "*", 1], [fields[loc].value for loc in fields])
+        self.assertTrue(fields[(1, 2)].flag)
+
+        # Out of bounds locs are not in the store
+        self.assertNotIn((2, 0), fields)
+        self.assertNotIn((0, -1), fields)
+
+    def test_pickle(self):
+        f = Field()
+        f.increment()
+        f.reveal()
+        f = pickle.loads(pickle.dumps(f))
+        self.assertEqual(1, f.value)
+        self.assertTrue(f.revealed)
+
+        # Fields saved before packing still load
+        f = Field.__new__(Field)
+        f.__setstate__({"value": "*", "flag": True, "revealed": False})
+        self.assertTrue(f.is_mined)
+        self.assertTrue(f.flag)
+        self.assertFalse(f.revealed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+import sys
+sys.path.append("..")
+import unittest
+import random
+from board import Board
+
+class testFloodFill(unittest.TestCase):
+
+    def stack_fill(self, board, loc):
+        # The original reveal: a stack that pushes every neighbour of every 0.
+        queue = [loc]
+        while queue:
+            _loc = queue.pop()
+            field = board.get_field(_loc)
+            if field.revealed:
+                continue
+            field.reveal()
+            if field.value != 0:
+                continue
+            queue.extend(board.graph[_loc])
+
+    def revealed(self, board):
+        return {loc for loc in board.fields if board.get_field(loc).revealed}
+
+    def test_matches_stack_fill(self):
+        rng = random.Random(3)
+        for mode in ("classic", "hexagon"):
+            for engine in ("fields", "array"):
+                for trial in range(20):
+                    r, c = rng.randint(1, 20), rng.randint(1, 20)
+                    mines = rng.randint(0, r * c // 6)
+                    seed = rng.random()
+                    fill = Board((r, c, 0), mode, engine)
+                    stack = Board((r, c, 0), mode)
+                    for b in (fill, stack):
+                        b.lay_mines(mines, seed)
+                        b.count_mines()
+
+                    # Start from a few fields the player already opened or flagged
+                    for i in range(3):
+                        loc = (rng.randrange(r), rng.randrange(c))
+                        for b in (fill, stack):
+                            b.get_field(loc).reveal()
+                    loc = (rng.randrange(r), rng.randrange(c))
+                    for b in (fill, stack):
+                        b.get_field(loc).set_flag(True)
+
+                    for i in range(5):
+                        loc = (rng.randrange(r), rng.randrange(c))
+                        before = self.revealed(stack)
+                        self.stack_fill(stack, loc)
+                        changes = fill.reveal_delta(loc)
+                        self.assertEqual(stack.get_board(), fill.get_board())
+                        # Exactly the fields that were opened are reported
+                        self.assertEqual(self.revealed(stack) - before, set(changes))
+
+
+if __name__ == "__main__":
+    unittest.main()
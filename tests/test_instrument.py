@@ -0,0 +1,55 @@
+import sys
+sys.path.append("..")
+import unittest
+import time
+import instrument
+
+class testInstrument(unittest.TestCase):
+
+    def tearDown(self):
+        instrument.disable()
+
+    def test_disabled(self):
+        instrument.disable()
+        move = instrument.move()
+        self.assertIsNone(move)
+        instrument.stage("board", move)
+        with instrument.span("snapshot"):
+            pass
+        self.assertIs(len, instrument.timed("snapshot", len))
+        self.assertEqual({}, instrument.summary())
+
+    def test_stages(self):
+        instrument.enable()
+        for i in range(10):
+            move = instrument.move()
+            instrument.stage("queue wait", move)
+            time.sleep(0.001)
+            instrument.stage("board", move)
+        self.assertEqual(3, instrument.timed("snapshot", len)("abc"))
+
+        summary = instrument.summary()
+        self.assertEqual({"queue wait", "board", "snapshot"}, set(summary))
+        self.assertEqual(10, summary["board"]["count"])
+        self.assertGreaterEqual(summary["board"]["p50"], 1)
+        self.assertLessEqual(summary["board"]["p50"], summary["board"]["p99"])
+
+        events = instrument.chrome_trace()["traceEvents"]
+        self.assertEqual(21, len(events))
+        self.assertEqual({"X"}, {event["ph"] for event in events})
+
+    def test_ring_buffer(self):
+        instrument.enable(size=5)
+        move = instrument.move()
+        for i in range(20):
+            instrument.stage("board", move)
+        self.assertEqual(5, instrument.summary()["board"]["count"])
+
+    def test_percentile(self):
+        ordered = list(range(1, 101))
+        self.assertEqual(50, instrument.percentile(ordered, 50))
+        self.assertEqual(99, instrument.percentile(ordered, 99))
+        self.assertEqual(7, instrument.percentile([7], 95))
+
+if __name__ == '__main__':
+    unittest.main()
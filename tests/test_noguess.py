@@ -0,0 +1,37 @@
+import sys
+sys.path.append("..")
+import unittest
+from noguess import generate, generate_board
+from solver import Solver
+
+class testNoGuess(unittest.TestCase):
+
+    def test_generate(self):
+        for mode in ("classic", "hexagon"):
+            for seed in range(5):
+                mines, first = generate(13, 16, 40, mode, seed=seed)
+                self.assertEqual(40, sum(mines))
+                self.assertEqual((6, 8), first)
+                self.assertEqual((mines, first), generate(13, 16, 40, mode, seed=seed))
+
+    def test_no_room(self):
+        # Nine fields and the first click keeps them all clear
+        self.assertIsNone(generate(3, 3, 1))
+
+    def test_unsolvable(self):
+        # None of the layouts of 3 mines on 2x8 from a corner can be solved
+        self.assertIsNone(generate(2, 8, 3, first=(0, 0), seed=1))
+
+    def test_solvable(self):
+        for mode in ("classic", "hexagon"):
+            for seed in range(5):
+                b = generate_board("intermediate", mode, seed)
+                self.assertEqual(0, b.get_value((6, 8)))
+                s = Solver.from_board(b)
+                while s.safe:
+                    for loc in list(s.safe):
+                        s.update(b.reveal_delta(loc))
+                self.assertEqual(b.r * b.c - 40, len(s.revealed))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import sys
+sys.path.append("..")
+import unittest
+import random
+from board import Board
+
+class testOpenings(unittest.TestCase):
+
+    def test_count(self):
+        # One mine in the corner leaves a single opening
+        b = Board("test", openings=True)
+        b.get_field((0, 0)).set_mine()
+        b.count_mines()
+        self.assertEqual(1, len(b.openings))
+        self.assertEqual(0, b.openings.label((3, 3)))
+        self.assertIsNone(b.openings.label((0, 1)))
+        self.assertEqual(15, len(b.openings.opening((3, 3))))
+
+        # A wall of mines one column from the edge leaves that column all
+        # numbers, so only the other side has an opening
+        b = Board("test", openings=True)
+        for row in range(4):
+            b.get_field((row, 2)).set_mine()
+        b.count_mines()
+        self.assertEqual(1, len(b.openings))
+
+        # A wall with room for 0s on both sides splits the board in two
+        b = Board((4, 6, 0), openings=True)
+        for row in range(4):
+            b.get_field((row, 3)).set_mine()
+        b.count_mines()
+        self.assertEqual(2, len(b.openings))
+
+    def test_matches_flood_fill(self):
+        rng = random.Random(11)
+        for mode in ("classic", "hexagon"):
+            for engine in ("fields", "array"):
+                for trial in range(20):
+                    r, c = rng.randint(1, 20), rng.randint(1, 20)
+                    mines = rng.randint(0, r * c // 5)
+                    seed = rng.random()
+                    indexed = Board((r, c, 0), mode, engine, openings=True)
+                    filled = Board((r, c, 0), mode, engine)
+                    for b in (indexed, filled):
+                        b.lay_mines(mines, seed)
+                        b.count_mines()
+
+                    for i in range(6):
+                        loc = (rng.randrange(r), rng.randrange(c))
+                        self.assertEqual(filled.reveal_delta(loc), indexed.reveal_delta(loc))
+                        self.assertEqual(filled.get_board(), indexed.get_board())
+
+
+if __name__ == "__main__":
+    unittest.main()
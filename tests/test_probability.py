@@ -0,0 +1,68 @@
+import sys
+sys.path.append("..")
+import unittest
+import itertools
+import random
+from board import Board
+from probability import ProbabilityEngine, enumerate_component
+
+class testProbability(unittest.TestCase):
+
+    def brute(self, graph, visible, total):
+        # Chances by trying every layout of the covered fields.
+        covered = [loc for loc, value in visible.items() if value is False or value == "f"]
+        tally = dict.fromkeys(covered, 0)
+        layouts = 0
+        for mines in itertools.combinations(covered, total):
+            mines = set(mines)
+            if all(
+                sum(e in mines for e in graph[loc]) == value
+                for loc, value in visible.items() if value not in (False, "f")
+            ):
+                layouts += 1
+                for loc in mines:
+                    tally[loc] += 1
+        return {loc: count / layouts for loc, count in tally.items()}
+
+    def test_enumerate(self):
+        # Two fields, one mine between them
+        self.assertEqual({1: (2, [1, 1])}, enumerate_component(2, (((0, 1), 1),)))
+        # A 1 over fields 0, 1 and a 1 over fields 1, 2
+        self.assertEqual({1: (1, [0, 1, 0]), 2: (1, [1, 0, 1])}, enumerate_component(3, (((0, 1), 1), ((1, 2), 1))))
+
+    def test_long_component(self):
+        # A chain of 1s over neighbouring fields, longer than the recursion limit
+        cells = sys.getrecursionlimit() * 2
+        constraints = tuple(((i, i + 1), 1) for i in range(cells - 1))
+        self.assertEqual({cells // 2: (2, [1] * cells)}, enumerate_component(cells, constraints))
+
+    def test_fifty_fifty(self):
+        graph = {(0, 0): [(0, 1)], (0, 1): [(0, 0), (0, 2)], (0, 2): [(0, 1)]}
+        chances = ProbabilityEngine(0).probabilities(graph, {(0, 0): False, (0, 1): 1, (0, 2): False}, 1)
+        self.assertEqual({(0, 0): 0.5, (0, 2): 0.5}, chances)
+
+    def test_brute(self):
+        rng = random.Random(3)
+        engine = ProbabilityEngine(0)
+        for mode in ("classic", "hexagon"):
+            for i in range(20):
+                b = Board((4, 5, 4), mode)
+                b.reveal_delta(rng.choice([loc for loc in b.fields if b.get_value(loc) != "*"]))
+                visible = {divmod(i, b.c): value for i, value in enumerate(b.get_board())}
+                expected = self.brute(b.graph, visible, 4)
+                chances = engine.from_board(b)
+                self.assertEqual(expected.keys(), chances.keys())
+                for loc in expected:
+                    self.assertAlmostEqual(expected[loc], chances[loc])
+
+    def test_cache(self):
+        b = Board("intermediate")
+        b.reveal_delta(next(loc for loc in b.fields if b.get_value(loc) == 0))
+        engine = ProbabilityEngine(0)
+        first = engine.from_board(b)
+        misses = engine.misses
+        self.assertEqual(first, engine.from_board(b))
+        self.assertEqual(misses, engine.misses)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,9 @@ import sys, os
 sys.path.append("..")
 import unittest
 import save_state
+import pickle
+import threading
+from board import Board
 
 class TestLoadAndSave(unittest.TestCase):
 
@@ -15,6 +18,172 @@ class TestLoadAndSave(unittest.TestCase):
         actual = save_state.load()
         self.assertEqual(expected, actual)
 
+    def test_board(self):
+        for mode in ("classic", "hexagon"):
+            for engine in ("fields", "array"):
+                expected = Board("expert", mode, engine)
+                expected.reveal((5, 5))
+                expected.flag((0, 0))
+                save_state.save_board(expected, 42, 1)
+
+                actual = save_state.load()
+                board = actual["board"]
+                self.assertEqual(42, actual["counter"])
+                self.assertEqual(1, actual["flags"])
+                self.assertEqual((mode, "expert", engine), (board.mode, board.difficulty, board.engine))
+                self.assertEqual(expected.get_total_number_of_mines(), board.get_total_number_of_mines())
+                self.assertEqual(expected.get_planes(), board.get_planes())
+                self.assertEqual(expected.get_board(), board.get_board())
+
+        # Far smaller than pickling the board
+        self.assertLess(os.path.getsize(".save") * 4, len(pickle.dumps({"board": expected})))
+
+    def test_damaged(self):
+        # A header naming a mode that doesn't exist can't be read, but doesn't crash
+        data = bytearray(save_state.encode_board(Board("beginner")))
+        data[5] = 9
+        save_state.write_atomic(bytes(data))
+        self.assertRaises(ValueError, save_state.decode_board, bytes(data))
+        self.assertFalse(save_state.load())
+        save_state.destroy()
+
+    def test_planes(self):
+        for plane in (b"", b"\x01", b"\x00\x01\x01" * 7):
+            packed = save_state.pack_plane(plane)
+            self.assertEqual((len(plane) + 7) // 8, len(packed))
+            self.assertEqual(plane, save_state.unpack_plane(packed, len(plane)))
+
+    def test_journal(self):
+        expected = Board("intermediate", "hexagon")
+        save_state.compact(expected, 0, 0)
+        self.assertEqual(0, os.path.getsize(save_state.LOG))
+
+        # Each move appends one small record
+        expected.flag((0, 0))
+        save_state.log_move(save_state.FLAG_ON, (0, 0), 3)
+        expected.flag((0, 1))
+        save_state.log_move(save_state.FLAG_ON, (0, 1), 4)
+        expected.flag((0, 1))
+        save_state.log_move(save_state.FLAG_OFF, (0, 1), 5)
+        expected.reveal((6, 6))
+        save_state.log_move(save_state.REVEAL, (6, 6), 7)
+        # Replaying a move twice changes nothing
+        save_state.log_move(save_state.REVEAL, (6, 6), 7)
+        self.assertEqual(5 * save_state.RECORD.size, os.path.getsize(save_state.LOG))
+
+        actual = save_state.load()
+        self.assertEqual(expected.get_board(), actual["board"].get_board())
+        self.assertEqual(7, actual["counter"])
+        self.assertEqual(expected.get_board().count("f"), actual["flags"])
+
+        # Compacting folds the journal into the snapshot
+        save_state.compact(actual["board"], actual["counter"], actual["flags"])
+        self.assertEqual(0, os.path.getsize(save_state.LOG))
+        self.assertEqual(expected.get_board(), save_state.load()["board"].get_board())
+
+        save_state.destroy()
+        self.assertFalse(os.path.isfile(save_state.LOG))
+
+    def test_journal_lock(self):
+        # A snapshot waits for a move to change the board and log itself
+        board = Board("expert", seed=3)
+        save_state.compact(board, 0, 0)
+        with save_state.journal_lock:
+            snapshot = threading.Thread(target=save_state.compact, args=(board, 0, 0))
+            snapshot.start()
+            snapshot.join(0.1)
+            self.assertTrue(snapshot.is_alive())
+            board.reveal_delta((8, 15))
+            save_state.log_move(save_state.REVEAL, (8, 15), 0)
+        snapshot.join()
+        self.assertEqual(board.get_board(), save_state.load()["board"].get_board())
+        save_state.destroy()
+
+    def test_mapped(self):
+        board = Board("expert", "hexagon", engine="mmap", path=save_state.FNAME)
+        save_state.compact(board, 0, 0)
+        board.reveal_delta((8, 8))
+        board.flag_delta((0, 0))
+        save_state.compact(board, 12, 1)
+
+        # Loading attaches to the same file
+        actual = save_state.load()
+        self.assertEqual(12, actual["counter"])
+        self.assertEqual(board.get_board().count("f"), actual["flags"])
+        self.assertEqual(("hexagon", "expert", "mmap"), (actual["board"].mode, actual["board"].difficulty, actual["board"].engine))
+        self.assertEqual(board.get_board(), actual["board"].get_board())
+        self.assertEqual(board.get_total_number_of_mines(), actual["board"].get_total_number_of_mines())
+
+        # Moves show up in every process attached to the file
+        reader = Board.attach(save_state.FNAME, readonly=True)
+        board.reveal_delta((15, 29))
+        self.assertEqual(board.get_board(), reader.get_board())
+        with self.assertRaises(TypeError):
+            reader.flag((0, 1))
+
+        # A snapshot of a mapped board loads into memory
+        save_state.save_board(board, 0, 0)
+        self.assertEqual("array", save_state.load()["board"].engine)
+        save_state.destroy()
+
+    def test_mapped_deferred(self):
+        # A mapped board saved before its first click keeps its mines to lay
+        board = Board("beginner", engine="mmap", path=save_state.FNAME, deferred=True, seed=5)
+        save_state.compact(board, 0, 0)
+        actual = save_state.load()["board"]
+        self.assertEqual(10, actual.get_total_number_of_mines())
+        self.assertFalse(actual.mines_laid)
+        self.assertEqual(board.board_id, actual.board_id)
+
+        actual.reveal_delta((4, 4))
+        self.assertEqual(10, actual.get_planes()[0].count(1))
+        self.assertEqual(bytes(Board.from_id(actual.board_id).get_planes()[0]), bytes(actual.get_planes()[0]))
+
+        # and the first click is kept when it is attached again
+        reader = Board.attach(save_state.FNAME, readonly=True)
+        self.assertEqual((True, (4, 4)), (reader.mines_laid, reader.first))
+        self.assertEqual(actual.board_id, reader.board_id)
+        save_state.destroy()
+
+        # A mapped board needs a file to live in
+        with self.assertRaises(ValueError):
+            Board("beginner", engine="mmap")
+
+    def test_deferred(self):
+        # A board without mines yet is saved as its board ID
+        board = Board("expert", "hexagon", deferred=True)
+        save_state.compact(board, 0, 0)
+        self.assertLess(os.path.getsize(save_state.FNAME), 16)
+
+        # and the journal replays its first click onto the same mines
+        board.reveal_delta((5, 5))
+        save_state.log_move(save_state.REVEAL, (5, 5), 2)
+        actual = save_state.load()["board"]
+        self.assertEqual(board.get_planes(), actual.get_planes())
+        self.assertEqual(board.board_id, actual.board_id)
+
+        # Snapshots keep the board ID too
+        save_state.compact(actual, 2, 0)
+        self.assertEqual(board.board_id, save_state.load()["board"].board_id)
+
+        # Flags placed before the first click outlive compacting
+        board = Board("expert", "hexagon", deferred=True)
+        board.flag_delta((0, 0))
+        save_state.log_move(save_state.FLAG_ON, (0, 0), 1)
+        save_state.compact(board, 1, 1)
+        self.assertEqual("f", save_state.load()["board"].get_visible((0, 0)))
+
+        # A snapshot from before the first click still lays its mines on it
+        board = Board("expert", "hexagon", deferred=True)
+        save_state.save_board(board, 0, 0)
+        actual = save_state.load()["board"]
+        self.assertFalse(actual.mines_laid)
+        self.assertEqual(board.get_total_number_of_mines(), actual.get_total_number_of_mines())
+        board.reveal_delta((5, 5))
+        actual.reveal_delta((5, 5))
+        self.assertEqual(board.get_planes(), actual.get_planes())
+        save_state.destroy()
+
     def test_delete(self):
         save_state.destroy()
         # Assert that file does no longer exist.
@@ -1,6 +1,7 @@
 import sys, os
 sys.path.append("..")
 import unittest
+import sqlite3
 from score import Scores
 
 class testScoreBoard(unittest.TestCase):
@@ -50,10 +51,22 @@ class testScoreBoard(unittest.TestCase):
             os.remove("test_scores.sqlite")
         except FileNotFoundError:
             print("")
+    def test_board_id(self):
+        # Tables made before board IDs get the column added
+        if os.path.exists("test_scores.sqlite"):
+            os.remove("test_scores.sqlite")
+        connection = sqlite3.connect("test_scores.sqlite")
+        connection.execute("CREATE TABLE Scores (points SMALLINT, name VARCHAR(24), mode VARCHAR(16), difficulty VARCHAR(32))")
+        connection.close()
 
+        sc = Scores(True)
+        self.assertTrue(sc.write_highscore("Ace", 12, "classic", "test", "BL22WSYI"))
+        sc.save()
 
-
-
+        connection = sqlite3.connect("test_scores.sqlite")
+        self.assertEqual([("BL22WSYI",)], connection.execute("SELECT board_id FROM Scores").fetchall())
+        connection.close()
+        os.remove("test_scores.sqlite")
 
 
 if __name__ == "__main__":
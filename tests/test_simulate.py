@@ -0,0 +1,42 @@
+import sys
+sys.path.append("..")
+import unittest
+from board import Board
+from simulate import play, bbbv, POLICIES
+
+class testSimulate(unittest.TestCase):
+
+    def test_bbbv(self):
+        b = Board("test")
+        # No mines: one opening clears the board
+        self.assertEqual(1, bbbv(b))
+        # A mine in the middle: its eight numbers form a ring, around one opening
+        b = Board((5, 5, 0))
+        b.get_field((2, 2)).set_mine()
+        b.count_mines()
+        self.assertEqual(1, bbbv(b))
+        # A mine in a corner of a 2x2: three numbers, no opening
+        b = Board((2, 2, 0))
+        b.get_field((0, 0)).set_mine()
+        b.count_mines()
+        self.assertEqual(3, bbbv(b))
+
+    def test_play(self):
+        for policy in POLICIES:
+            for mode in ("classic", "hexagon"):
+                result = play(mode, "beginner", 7, policy)
+                self.assertGreater(result["bbbv"], 0)
+                self.assertGreater(result["clicks"], 0)
+                # The same seed plays the same game
+                del result["time"]
+                again = play(mode, "beginner", 7, policy)
+                del again["time"]
+                self.assertEqual(result, again)
+
+    def test_noguess(self):
+        # The solver never has to guess on a no-guess board
+        for seed in range(5):
+            self.assertTrue(play("classic", "intermediate", seed, "solver", "noguess")["won"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+sys.path.append("..")
+import unittest
+import random
+from board import Board
+from solver import Solver
+
+class testSolver(unittest.TestCase):
+
+    def board(self, rows, mode="classic"):
+        # Builds a board from rows of text, * for a mine.
+        b = Board((len(rows), len(rows[0]), 0), mode)
+        for row, line in enumerate(rows):
+            for col, char in enumerate(line):
+                if char == "*":
+                    b.get_field((row, col)).set_mine()
+        b.count_mines()
+        return b
+
+    def test_single(self):
+        b = self.board([
+            "*...",
+            "....",
+            "....",
+        ])
+        s = Solver(b.graph)
+        s.update(b.reveal_delta((2, 3)))
+        # Only (0, 0) is left covered next to a 1, so it is the mine
+        self.assertEqual({(0, 0)}, s.mines)
+        self.assertEqual(set(), s.safe)
+
+    def test_count(self):
+        # (0, 2) touches no number, but once the only mine is found it is safe
+        graph = {(0, 0): [(0, 1)], (0, 1): [(0, 0)], (0, 2): []}
+        s = Solver(graph)
+        s.update({(0, 0): 1})
+        self.assertEqual({(0, 1)}, s.mines)
+        self.assertEqual(set(), s.safe)
+
+        s = Solver(graph, 1)
+        s.update({(0, 0): 1})
+        self.assertEqual({(0, 1)}, s.mines)
+        self.assertEqual({(0, 2)}, s.safe)
+
+    def test_subset(self):
+        # The 1-2-1 pattern: the 1s share fields with the 2
+        b = self.board([
+            "*.*",
+            "...",
+        ])
+        s = Solver(b.graph)
+        s.update(b.reveal_delta((1, 0)))
+        s.update(b.reveal_delta((1, 1)))
+        s.update(b.reveal_delta((1, 2)))
+        self.assertEqual({(0, 0), (0, 2)}, s.mines)
+        self.assertEqual({(0, 1)}, s.safe)
+        self.assertEqual((0, 1), s.hint())
+
+        # Seeing the same board in one go gives the same answer
+        s = Solver.from_board(b)
+        self.assertEqual({(0, 0), (0, 2)}, s.mines)
+        self.assertEqual({(0, 1)}, s.safe)
+
+    def test_never_wrong(self):
+        rng = random.Random(9)
+        for mode in ("classic", "hexagon"):
+            for trial in range(30):
+                b = Board("expert", mode)
+                s = Solver(b.graph, b.get_total_number_of_mines())
+                while True:
+                    loc = s.hint()
+                    if loc is None:
+                        # Guess somewhere covered
+                        loc = (rng.randrange(b.r), rng.randrange(b.c))
+                        if b.get_field(loc).revealed or loc in s.mines:
+                            continue
+                    changes = b.reveal_delta(loc)
+                    if b.get_field(loc).is_mined:
+                        break
+                    s.update(changes)
+                    for mine in s.mines:
+                        self.assertTrue(b.get_field(mine).is_mined)
+                    for safe in s.safe:
+                        self.assertFalse(b.get_field(safe).is_mined)
+                    if sum(1 for v in b.get_board() if v is False) == b.get_total_number_of_mines():
+                        break
+
+
+if __name__ == "__main__":
+    unittest.main()
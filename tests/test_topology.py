@@ -0,0 +1,62 @@
+import sys
+sys.path.append("..")
+import unittest
+import random
+import pickle
+from board import Board
+from topology import count_classic, count_hexagon, HexagonTopology, GraphView
+
+class testTopology(unittest.TestCase):
+
+    def count_by_graph(self, board, mines):
+        # Counts mined neighbours the slow way, edge by edge.
+        expected = []
+        for loc in board.fields:
+            if mines[loc[0] * board.c + loc[1]]:
+                expected.append(0)
+            else:
+                expected.append(sum(mines[r * board.c + c] for r, c in board.graph[loc]))
+        return expected
+
+    def test_counts_match_graph(self):
+        rng = random.Random(7)
+        for mode, count in (("classic", count_classic), ("hexagon", count_hexagon)):
+            for r, c, m in ((4, 4, 5), (8, 10, 30), (13, 16, 200), (1, 7, 3)):
+                b = Board((r, c, 0), mode)
+                mines = bytes(1 if rng.random() < m / (r * c) else 0 for i in range(r * c))
+                self.assertEqual(self.count_by_graph(b, mines), list(count(mines, r, c)))
+
+    def test_board_counts(self):
+        # Both engines count the same mines the same way
+        for mode in ("classic", "hexagon"):
+            fields = Board("intermediate", mode)
+            planes = Board((fields.r, fields.c, 0), mode, engine="array")
+            for loc in fields.fields:
+                if fields.get_field(loc).is_mined:
+                    planes.get_field(loc).set_mine()
+            planes.count_mines()
+            for loc in fields.fields:
+                self.assertEqual(fields.get_value(loc), planes.get_value(loc))
+
+    def test_lazy_graph(self):
+        # The graph view looks like a dict of vertex:edges
+        t = HexagonTopology(3, 3, cache=4)
+        graph = GraphView(t)
+        self.assertEqual(9, len(graph))
+        self.assertEqual([(0, 1), (1, 0)], graph[(0, 0)])
+        self.assertEqual([(0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (1, 0)], graph[(1, 1)])
+        self.assertNotIn((3, 0), graph)
+        with self.assertRaises(KeyError):
+            graph[(-1, 0)]
+
+        # Changing an edge list doesn't change the cache
+        graph[(0, 0)].append((2, 2))
+        self.assertEqual([(0, 1), (1, 0)], graph[(0, 0)])
+
+        # Cached topologies still pickle
+        t = pickle.loads(pickle.dumps(t))
+        self.assertEqual([(0, 1), (1, 0)], t.neighbours((0, 0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
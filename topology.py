@@ -0,0 +1,185 @@
+'''
+Topologies describe which vertices of a board are neighbours.
+
+Neighbours are worked out from the coordinates when asked for, rather than
+stored as a dict of edge lists for every vertex.
+
+For whole-board neighbour counting, a plane of one byte per vertex (row by row) is packed into a single big
+integer, so every vertex becomes an 8 bit lane. Shifting the integer by 8 bits
+moves every lane one column over, and shifting by 8 * c bits moves it one row
+over. Adding shifted copies of the mine plane counts every neighbour of every
+vertex in a handful of big integer operations instead of one Python loop
+iteration per edge. A vertex has at most 8 neighbours, so lanes never carry
+into each other.
+'''
+from collections.abc import Mapping
+from functools import lru_cache
+
+
+def _lanes(pattern, r):
+    # Repeats a row of lane values r times and packs it into an integer.
+    return int.from_bytes(bytes(pattern) * r, "big")
+
+
+def _shift_rows(x, c, full):
+    # Adds the lanes of the rows above and below each row.
+    return (x >> (8 * c)) + ((x << (8 * c)) & full)
+
+
+def count_classic(mines, r, c):
+    '''
+    Counts mined neighbours on a classic board (8 neighbours per vertex)
+    :param mines: Plane of r * c bytes, 1 for a mine
+    :return: bytearray of counts, 0 for mined vertices
+    '''
+    n = r * c
+    m = int.from_bytes(bytes(mines), "big")
+    full = _lanes([0xff] * c, r)
+    has_left = _lanes([0] + [0xff] * (c - 1), r)
+    has_right = _lanes([0xff] * (c - 1) + [0], r)
+
+    # Each lane holds itself plus its left and right neighbours
+    row_sum = m + ((m >> 8) & has_left) + ((m << 8) & has_right)
+    counts = row_sum + _shift_rows(row_sum, c, full) - m
+
+    # Mined vertices carry no count
+    counts &= full ^ (m * 0xff)
+    return bytearray(counts.to_bytes(n, "big"))
+
+
+def count_hexagon(mines, r, c):
+    '''
+    Counts mined neighbours on a hexagon board (6 neighbours per vertex).
+    Even rows touch columns (col - 1, col) of the rows above and below,
+    odd rows touch columns (col, col + 1).
+    :param mines: Plane of r * c bytes, 1 for a mine
+    :return: bytearray of counts, 0 for mined vertices
+    '''
+    n = r * c
+    m = int.from_bytes(bytes(mines), "big")
+    full = _lanes([0xff] * c, r)
+    has_left = _lanes([0] + [0xff] * (c - 1), r)
+    has_right = _lanes([0xff] * (c - 1) + [0], r)
+    even_rows = int.from_bytes((bytes([0xff] * c) + bytes(c)) * (r // 2) + bytes([0xff] * c) * (r % 2), "big")
+    odd_rows = full ^ even_rows
+
+    left = (m >> 8) & has_left
+    right = (m << 8) & has_right
+    counts = left + right
+    counts += _shift_rows(m + left, c, full) & even_rows
+    counts += _shift_rows(m + right, c, full) & odd_rows
+
+    # Mined vertices carry no count
+    counts &= full ^ (m * 0xff)
+    return bytearray(counts.to_bytes(n, "big"))
+
+
+class Topology:
+    '''
+    Base class for a grid of r rows by c columns.
+    Subclasses set moves: the legal moves for (even rows, odd rows), and
+    counter: the function that counts the mined neighbours of a plane.
+    '''
+    moves = ((), ())
+
+    def __init__(self, r, c, cache=0):
+        '''
+        :param r: Number of rows
+        :param c: Number of columns
+        :param cache: Size of an LRU cache of neighbour lists, 0 for none
+        '''
+        self.r = r
+        self.c = c
+        self.cache = cache
+        if cache:
+            # The cache keeps tuples and callers get a list of their own, so
+            # changing one can't change what the cache hands out next
+            neighbours = type(self).neighbours
+            cached = lru_cache(maxsize=cache)(lambda loc: tuple(neighbours(self, loc)))
+            self.neighbours = lambda loc: list(cached(loc))
+
+    def __getstate__(self):
+        # The cache wraps a bound method, which can't be pickled
+        state = self.__dict__.copy()
+        state.pop("neighbours", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(state["r"], state["c"], state["cache"])
+
+    def __contains__(self, loc):
+        try:
+            row, col = loc
+        except (TypeError, ValueError):
+            return False
+        return 0 <= row < self.r and 0 <= col < self.c
+
+    def neighbours(self, loc):
+        '''
+        Works out the edges of a vertex
+        :param loc: (row, col)
+        :return: List of neighbouring locs, in legal move order
+        '''
+        row, col = loc
+        r, c = self.r, self.c
+        edges = []
+        for edge_r, edge_c in self.moves[row % 2]:
+            e_r = row + edge_r
+            e_c = col + edge_c
+            # Guard: Check that loc is not out of bounds
+            if 0 <= e_r < r and 0 <= e_c < c:
+                edges.append((e_r, e_c))
+        return edges
+
+    def count(self, mines):
+        '''
+        Counts the mined neighbours of every vertex at once
+        :param mines: Plane of r * c bytes, 1 for a mine
+        :return: bytearray of counts, 0 for mined vertices
+        '''
+        return self.counter(mines, self.r, self.c)
+
+
+class ClassicTopology(Topology):
+    # Every vertex has 8 neighbours around it
+    _moves = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+    moves = (_moves, _moves)
+    counter = staticmethod(count_classic)
+
+
+class HexagonTopology(Topology):
+    # Odd rows are shifted right by half a hexagon
+    moves = (
+        ((-1, -1), (-1, 0), (0, 1), (1, 0), (1, -1), (0, -1)),
+        ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (0, -1))
+    )
+    counter = staticmethod(count_hexagon)
+
+
+TOPOLOGIES = {
+    "classic": ClassicTopology,
+    "hexagon": HexagonTopology
+}
+
+
+class GraphView(Mapping):
+    '''
+    Read-only k:v view of vertex:edges for a topology, like the old graph dict.
+    Edge lists are worked out when looked up.
+    '''
+
+    def __init__(self, topology):
+        self.topology = topology
+
+    def __getitem__(self, loc):
+        if loc not in self.topology:
+            raise KeyError(loc)
+        return self.topology.neighbours(loc)
+
+    def __iter__(self):
+        for row in range(self.topology.r):
+            for col in range(self.topology.c):
+                yield (row, col)
+
+    def __len__(self):
+        return self.topology.r * self.topology.c
@@ -0,0 +1,248 @@
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+"""
+BoardView
+One widget that paints the whole board, instead of a button per field.
+
+.set_cell(loc, value) with what the player sees, as from Board.get_board()
+.left_click(func), .right_click(func) call func(loc)
+
+Only the fields inside the area Qt asks to repaint are painted, and
+set_cell() only marks its own field's rectangle dirty, so Qt paints a
+flood fill in one pass. Inside a QScrollArea that area is the part in view,
+so big boards paint no more than what fits on screen.
+"""
+
+COLOURS = {
+    1: "blue",
+    2: "green",
+    3: "red",
+    4: "navy",
+    5: "maroon",
+    6: "turqoise",
+    7: "purple",
+    8: "grey"
+}
+
+# Classic fields are squares of this many pixels
+SQUARE = 24
+
+# Hexagon fields: column pitch, row pitch, the shift of odd rows and the
+# height of a hexagon, whose points reach into the rows above and below
+HEX_WIDTH = 29
+HEX_PITCH = 25
+HEX_SHIFT = 15
+HEX_HEIGHT = 33
+HEXAGON = QtGui.QPolygonF([
+    QtCore.QPointF(14.5, 0.5), QtCore.QPointF(28, 8.5), QtCore.QPointF(28, 24.5),
+    QtCore.QPointF(14.5, 32.5), QtCore.QPointF(1, 24.5), QtCore.QPointF(1, 8.5)
+])
+
+
+class BoardView(QtWidgets.QWidget):
+    leftClicked = QtCore.pyqtSignal(object)
+    rightClicked = QtCore.pyqtSignal(object)
+
+    def __init__(self, r, c, mode, parent=None):
+        super(BoardView, self).__init__(parent)
+        self.r = r
+        self.c = c
+        self.mode = mode
+        # What the player sees on each field, row by row
+        self.cells = [False] * (r * c)
+        self.hover = None
+
+        if mode == "hexagon":
+            self.setFixedSize(c * HEX_WIDTH + HEX_SHIFT, (r - 1) * HEX_PITCH + HEX_HEIGHT)
+        else:
+            self.setFixedSize(c * SQUARE, r * SQUARE)
+        self.setMouseTracking(True)
+
+        self.font_square = QtGui.QFont()
+        self.font_square.setPointSize(16)
+        self.font_square.setBold(True)
+        self.font_hexagon = QtGui.QFont()
+        self.font_hexagon.setBold(True)
+
+    def left_click(self, func):
+        # Connects passed function to left click event listener
+        self.leftClicked.connect(func)
+
+    def right_click(self, func):
+        # Connects passed function to right click event listener
+        self.rightClicked.connect(func)
+
+    def reset(self, cells=None):
+        '''
+        Shows a new game
+        :param cells: What the player sees on each field, all covered by default
+        '''
+        self.cells = list(cells) if cells is not None else [False] * (self.r * self.c)
+        self.update()
+
+    def set_cell(self, loc, value):
+        '''
+        Shows a new value on one field, repainting only that field
+        :param loc:
+        :param value: False if covered, "f" if flagged, otherwise the value
+        '''
+        i = loc[0] * self.c + loc[1]
+        # Guard: Nothing to repaint if nothing changed
+        if self.cells[i] == value and type(self.cells[i]) is type(value):
+            return
+        self.cells[i] = value
+        self.update(self.cell_rect(*loc))
+
+    def cell_rect(self, row, col):
+        # The rectangle a field is painted in.
+        if self.mode == "hexagon":
+            x = col * HEX_WIDTH + (HEX_SHIFT if row % 2 else 0)
+            return QtCore.QRect(x, row * HEX_PITCH, HEX_WIDTH, HEX_HEIGHT)
+        return QtCore.QRect(col * SQUARE, row * SQUARE, SQUARE, SQUARE)
+
+    def cells_in(self, rect):
+        '''
+        The fields whose rectangles overlap rect
+        :return: (range of rows, range of columns)
+        '''
+        if self.mode == "hexagon":
+            rows = range(max(0, (rect.top() - HEX_HEIGHT) // HEX_PITCH + 1), min(self.r, rect.bottom() // HEX_PITCH + 1))
+            cols = range(max(0, (rect.left() - HEX_SHIFT) // HEX_WIDTH), min(self.c, rect.right() // HEX_WIDTH + 1))
+        else:
+            rows = range(max(0, rect.top() // SQUARE), min(self.r, rect.bottom() // SQUARE + 1))
+            cols = range(max(0, rect.left() // SQUARE), min(self.c, rect.right() // SQUARE + 1))
+        return rows, cols
+
+    def cell_at(self, x, y):
+        '''
+        Maps a point on the widget to a field
+        :return: loc, None if the point is on no field
+        '''
+        if self.mode != "hexagon":
+            row, col = int(y // SQUARE), int(x // SQUARE)
+        else:
+            # Hexagons tile the plane as the fields nearest their centres. The
+            # nearest centre is in the column under x, in this row or a next one.
+            best = None
+            for row in range(int(y // HEX_PITCH) - 1, int(y // HEX_PITCH) + 1):
+                shift = HEX_SHIFT if row % 2 else 0
+                col = int((x - shift) // HEX_WIDTH)
+                cx = col * HEX_WIDTH + shift + HEX_WIDTH / 2
+                cy = row * HEX_PITCH + HEX_HEIGHT / 2
+                distance = (x - cx) ** 2 + (y - cy) ** 2
+                if best is None or distance < best[0]:
+                    best = (distance, row, col)
+            row, col = best[1], best[2]
+        if 0 <= row < self.r and 0 <= col < self.c:
+            return (row, col)
+        return None
+
+    def mouseReleaseEvent(self, event):
+        loc = self.cell_at(event.x(), event.y())
+        if loc is None:
+            return
+        if event.button() == QtCore.Qt.LeftButton:
+            self.leftClicked.emit(loc)
+        elif event.button() == QtCore.Qt.RightButton:
+            self.rightClicked.emit(loc)
+
+    def mouseMoveEvent(self, event):
+        # Highlights the covered field under the mouse.
+        loc = self.cell_at(event.x(), event.y())
+        if loc != self.hover:
+            for _loc in (self.hover, loc):
+                if _loc is not None:
+                    self.update(self.cell_rect(*_loc))
+            self.hover = loc
+
+    def leaveEvent(self, event):
+        if self.hover is not None:
+            self.update(self.cell_rect(*self.hover))
+            self.hover = None
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(event.rect(), self.palette().window())
+        if self.mode == "hexagon":
+            painter.setRenderHint(QtGui.QPainter.Antialiasing)
+            painter.setFont(self.font_hexagon)
+        else:
+            painter.setFont(self.font_square)
+
+        rows, cols = self.cells_in(event.rect())
+        for row in rows:
+            for col in cols:
+                rect = self.cell_rect(row, col)
+                value = self.cells[row * self.c + col]
+                hover = (row, col) == self.hover
+                if self.mode == "hexagon":
+                    self.paint_hexagon(painter, rect, value, hover)
+                else:
+                    self.paint_square(painter, rect, value, hover)
+        painter.end()
+
+    def paint_square(self, painter, rect, value, hover):
+        if value is False or value == "f":
+            # Raised: light on the top and left, dark on the bottom and right
+            painter.fillRect(rect, QtGui.QColor(185, 185, 185) if hover else QtGui.QColor(200, 200, 200))
+            painter.fillRect(rect.x(), rect.y(), rect.width(), 2, QtGui.QColor("#fff"))
+            painter.fillRect(rect.x(), rect.y(), 2, rect.height(), QtGui.QColor("#fff"))
+            painter.fillRect(rect.x(), rect.bottom() - 1, rect.width(), 2, QtGui.QColor(117, 117, 117))
+            painter.fillRect(rect.right() - 1, rect.y(), 2, rect.height(), QtGui.QColor(117, 117, 117))
+        else:
+            # Flat, with a thin border
+            painter.fillRect(rect, QtGui.QColor(200, 200, 200))
+            painter.setPen(QtGui.QColor(117, 117, 117))
+            painter.drawRect(rect.adjusted(0, 0, -1, -1))
+        self.paint_text(painter, rect, value)
+
+    def paint_hexagon(self, painter, rect, value, hover):
+        covered = value is False or value == "f"
+        colour = "#ebbd34" if covered else "#ccc"
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(QtGui.QColor(colour).darker(110) if covered and hover else QtGui.QColor(colour))
+        painter.drawPolygon(HEXAGON.translated(rect.x(), rect.y()))
+        self.paint_text(painter, rect, value)
+
+    def paint_text(self, painter, rect, value):
+        if value is False or value == 0:
+            return
+        if value == "*":
+            text, colour = "💣", "black"
+        elif value == "f":
+            text, colour = "🚩", "black"
+        else:
+            text, colour = str(value), COLOURS[value]
+        painter.setPen(QtGui.QColor(colour))
+        painter.drawText(rect, QtCore.Qt.AlignCenter, text)
+
+
+def scroll_area(view, parent=None):
+    '''
+    Puts a view in a QScrollArea, for boards bigger than the window.
+    Qt only asks for the part in view to be painted, so scrolling paints
+    a screenful of fields at a time, whatever the size of the board.
+    :return: QScrollArea
+    '''
+    area = QtWidgets.QScrollArea(parent)
+    area.setWidget(view)
+    return area
+
+
+def test_main():
+    import sys, random
+
+    app = QtWidgets.QApplication(sys.argv)
+
+    # A 1000x1000 board opens as fast as a small one
+    view = BoardView(1000, 1000, sys.argv[1] if len(sys.argv) > 1 else "classic")
+    view.left_click(lambda loc: view.set_cell(loc, random.choice([0, 1, 2, 3, "*"])))
+    view.right_click(lambda loc: view.set_cell(loc, "f"))
+
+    area = scroll_area(view)
+    area.resize(800, 600)
+    area.show()
+    sys.exit(app.exec_())
+
+if __name__ == '__main__':
+    test_main()
@@ -4,9 +4,70 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 HexButton
 .text = ""
 .move(x, y)
+
+Each hexagon icon is rendered once per process and shared: draw() swaps in
+the cached icon for the colour, so flattening a field renders nothing.
+HEXAGONS.hits and HEXAGONS.misses show how often the cache was enough.
 """
 DEBUG = False
 
+# Size the hexagon icons are shown at
+ICON_SIZE = 30
+
+# Style of the label on a covered field
+LABEL_STYLE = """
+                color: blue;
+                font-weight: bold;
+                """
+
+
+def svg_hexagon(colour, size=31):
+    # The hexagon as an SVG, drawn on a 31x31 grid and rendered at size pixels.
+    svg_bytes = f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 31 31"><path stroke="none" fill="{colour.name()}" d="M12.5 1.2320508075689a6 6 0 0 1 6 0l7.856406460551 4.5358983848622a6 6 0 0 1 3 5.1961524227066l0 9.0717967697245a6 6 0 0 1 -3 5.1961524227066l-7.856406460551 4.5358983848622a6 6 0 0 1 -6 0l-7.856406460551 -4.5358983848623a6 6 0 0 1 -3 -5.1961524227066l0 -9.0717967697245a6 6 0 0 1 3 -5.1961524227066"></path></svg>'
+    return bytearray(svg_bytes, encoding="utf-8")
+
+
+class HexagonCache:
+    '''
+    Hexagon icons by (colour, size, device pixel ratio), each rendered once.
+    '''
+
+    def __init__(self):
+        self.icons = {}
+        self.hits = 0
+        self.misses = 0
+
+    def icon(self, colour, size, dpr=1.0):
+        '''
+        :param colour: Any colour QColor takes, such as "#ccc"
+        :param size: Size in pixels the icon is shown at
+        :param dpr: Device pixel ratio of the screen it is shown on
+        :return: QIcon
+        '''
+        key = (colour, size, dpr)
+        icon = self.icons.get(key)
+        if icon is not None:
+            self.hits += 1
+            return icon
+
+        self.misses += 1
+        # Render at the screen's real resolution, so it stays sharp on HiDPI
+        pixels = round(size * dpr)
+        qimage = QtGui.QImage.fromData(svg_hexagon(QtGui.QColor(colour), pixels))
+        pixmap = QtGui.QPixmap(qimage)
+        pixmap.setDevicePixelRatio(dpr)
+        icon = self.icons[key] = QtGui.QIcon(pixmap)
+        return icon
+
+    @property
+    def hit_rate(self):
+        # Share of draws that didn't render anything.
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+HEXAGONS = HexagonCache()
+
 
 class HexGuiField(QtWidgets.QPushButton):
     textChanged = QtCore.pyqtSignal(str)
@@ -14,45 +75,25 @@ class HexGuiField(QtWidgets.QPushButton):
     def __init__(self, loc, parent):
         super(HexGuiField, self).__init__(parent)
         # Default values
-        if DEBUG:
-            self.setToolTip(str(loc))
-
         self.__text = ""
-        self.loc = loc
-
-        # A regular offset exists, to move the entire grid into the centre.
-        self.offset = (6, 50)
-
-        # If it's an odd row, we shift it right, by adding to offset.
-        if loc[0] % 2:
-            self.offset = (self.offset[0] + 15, self.offset[1])
+        self.__colour = None
+        self.__label_style = None
 
         self.text_label = QtWidgets.QLabel()
 
         self.resize(29, 29)
-        self.move(self.loc[1] * 29 + self.offset[0], self.loc[0] * 25 + self.offset[1])
+        self.place(loc)
 
         # Create the label
         self.text_label.setMinimumWidth(16)
         self.text_label.setMinimumHeight(16)
-        self.text_label.setStyleSheet("""
-                color: blue;
-                font-weight: bold;
-                """)
+        self.set_label_style(LABEL_STYLE)
         # Centre the text in the hexagon
         lay = QtWidgets.QVBoxLayout(self)
         lay.setContentsMargins(2, 2, 0, 0)
         lay.addWidget(self.text_label, alignment=QtCore.Qt.AlignCenter)
 
-        self.draw("#ebbd34")
-
-    def draw(self, colour):
-        # Create the hexagon shape
-        # Get the SVG, set colour, make it the icon of the button.
-        qimage = QtGui.QImage.fromData(self.svg_hexagon(QtGui.QColor(colour)))
-        qicon = QtGui.QPixmap(qimage)
-        self.setIcon(QtGui.QIcon(qicon))
-        self.setIconSize(QtCore.QSize(30, 30))
+        self.setIconSize(QtCore.QSize(ICON_SIZE, ICON_SIZE))
         self.setStyleSheet(
             """
             margin: 0px;
@@ -60,20 +101,52 @@ class HexGuiField(QtWidgets.QPushButton):
             position: absolute;
             border: none;
         """)
+        self.draw("#ebbd34")
 
+    def place(self, loc):
+        # Moves the field to loc. Clicks report the new loc.
+        self.loc = loc
+        if DEBUG:
+            self.setToolTip(str(loc))
 
-    def svg_hexagon(self, colour):
-        svg_bytes = f'<svg xmlns="http://www.w3.org/2000/svg" width="31" height="31"><path stroke="none" fill="{colour.name()}" d="M12.5 1.2320508075689a6 6 0 0 1 6 0l7.856406460551 4.5358983848622a6 6 0 0 1 3 5.1961524227066l0 9.0717967697245a6 6 0 0 1 -3 5.1961524227066l-7.856406460551 4.5358983848622a6 6 0 0 1 -6 0l-7.856406460551 -4.5358983848623a6 6 0 0 1 -3 -5.1961524227066l0 -9.0717967697245a6 6 0 0 1 3 -5.1961524227066"></path></svg>'
-        return bytearray(svg_bytes, encoding="utf-8")
+        # A regular offset exists, to move the entire grid into the centre.
+        self.offset = (6, 50)
+
+        # If it's an odd row, we shift it right, by adding to offset.
+        if loc[0] % 2:
+            self.offset = (self.offset[0] + 15, self.offset[1])
+
+        self.move(self.loc[1] * 29 + self.offset[0], self.loc[0] * 25 + self.offset[1])
+
+    def reset(self):
+        # Covers the field again, for a new game.
+        self.text = ""
+        self.draw("#ebbd34")
+        self.set_label_style(LABEL_STYLE)
+
+    def set_label_style(self, style):
+        # Guard: Parsing a stylesheet is slow, so skip it if nothing changes
+        if style == self.__label_style:
+            return
+        self.__label_style = style
+        self.text_label.setStyleSheet(style)
+
+    def draw(self, colour):
+        # Make the hexagon of that colour the icon of the button.
+        # Guard: Already that colour
+        if colour == self.__colour:
+            return
+        self.__colour = colour
+        self.setIcon(HEXAGONS.icon(colour, ICON_SIZE, self.devicePixelRatioF()))
 
     def left_click(self, func):
         # Connects passed function to left click event listener
-        self.clicked.connect(lambda *args, loc=self.loc: func(loc))
+        self.clicked.connect(lambda *args: func(self.loc))
 
     def right_click(self, func):
         # Connects passed function to right click event listener
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.customContextMenuRequested.connect(lambda *args, loc=self.loc: func(loc))
+        self.customContextMenuRequested.connect(lambda *args: func(self.loc))
 
     def flatten(self, colour=False):
         '''
@@ -98,11 +171,11 @@ class HexGuiField(QtWidgets.QPushButton):
         if colour is False:
             self.draw("#ccc")
             # Flatten the button, no text colour
-            self.text_label.setStyleSheet(f"{style} }}")
+            self.set_label_style(f"{style} }}")
         else:
             self.draw("#ccc")
             # Flatten the button and set text colour
-            self.text_label.setStyleSheet(f"{style} color: {COLOURS[colour]} }}")
+            self.set_label_style(f"{style} color: {COLOURS[colour]} }}")
 
     @property
     def text(self):
@@ -2,14 +2,61 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 
 DEBUG = False
 
+COLOURS = {
+    1: "blue",
+    2: "green",
+    3: "red",
+    4: "navy",
+    5: "maroon",
+    6: "turqoise",
+    7: "purple",
+    8: "grey"
+}
+
+# One stylesheet for every field, installed on the application by
+# install_style(). Fields pick their rules with the state and number
+# properties, so changing a field's look never parses any CSS.
+STYLE = """
+    SquareGuiField[state="covered"]:hover{
+      background-color: rgb(185, 185, 185);
+    }
+    SquareGuiField[state="covered"]{
+      width: 16px; height: 16px;
+      border-width: 2px;
+      border-style: solid;
+      border-color: #fff, rgb(117, 117, 117), rgb(117, 5, 117), #fff;
+      background-color: rgb(200, 200, 200);
+    }
+    SquareGuiField[state="flat"]{
+      width: 20px; height: 20px;
+      border: 0.5px solid;
+      border-color: rgb(117, 117, 117);
+      font-size:16pt;
+      font-weight: bold;
+      background-color: rgb(200, 200, 200);
+    }
+""" + "".join(
+    f"""
+    SquareGuiField[state="flat"][number="{number}"]{{
+      color: {colour};
+    }}"""
+    for number, colour in COLOURS.items()
+)
+
+
+def install_style(app=None):
+    # Adds STYLE to the application's stylesheet, once.
+    app = app or QtWidgets.QApplication.instance()
+    if STYLE not in app.styleSheet():
+        app.setStyleSheet(app.styleSheet() + STYLE)
+
 class SquareGuiField(QtWidgets.QPushButton):
     textChanged = QtCore.pyqtSignal(str)
 
     def __init__(self, loc, parent):
         super(SquareGuiField, self).__init__(parent)
         # Default values
-        if DEBUG:
-            self.setToolTip(str(loc))
+        self.__text = None
         self.text = " "
         self.loc = loc
         self.offset = (6, 50)
@@ -17,31 +64,50 @@ class SquareGuiField(QtWidgets.QPushButton):
 
 
     def init(self):
-        self.move(self.loc[1]*24+self.offset[0], self.loc[0]*24+self.offset[1])
+        self.place(self.loc)
         self.resize(24, 24)
         self.setFlat(False)
-        # Set starting stylesheet
-        self.setStyleSheet("""
-            QPushButton:hover{
-              background-color: rgb(185, 185, 185);
-            }
-            QPushButton{
-              width: 16px; height: 16px;
-              border-width: 2px;
-              border-style: solid;
-              border-color: #fff, rgb(117, 117, 117), rgb(117, 5, 117), #fff;
-              background-color: rgb(200, 200, 200);
-            }
-        """)
+        # Set starting style
+        self.__style = None
+        self.set_style("covered")
+
+    def set_style(self, state, number=0):
+        '''
+        Picks the rules of STYLE the field is drawn with
+        :param state: "covered" or "flat"
+        :param number: 1-8 to colour the text of a flat field, 0 for none
+        :return: No value
+        '''
+        # Guard: Restyling is the slow part, so skip it if nothing changes
+        if (state, number) == self.__style:
+            return
+        self.__style = (state, number)
+        self.setProperty("state", state)
+        self.setProperty("number", number)
+        # Qt doesn't restyle on a property change by itself
+        self.style().unpolish(self)
+        self.style().polish(self)
+
+    def place(self, loc):
+        # Moves the field to loc. Clicks report the new loc.
+        self.loc = loc
+        if DEBUG:
+            self.setToolTip(str(loc))
+        self.move(self.loc[1]*24+self.offset[0], self.loc[0]*24+self.offset[1])
+
+    def reset(self):
+        # Covers the field again, for a new game.
+        self.text = " "
+        self.set_style("covered")
 
     def left_click(self, func):
         # Connects passed function to left click event listener
-        self.clicked.connect(lambda *args, loc=self.loc: func(loc))
+        self.clicked.connect(lambda *args: func(self.loc))
 
     def right_click(self, func):
         # Connects passed function to right click event listener
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.customContextMenuRequested.connect(lambda *args, loc=self.loc: func(loc))
+        self.customContextMenuRequested.connect(lambda *args: func(self.loc))
 
     def flatten(self, colour=False):
         '''
@@ -49,31 +115,7 @@ class SquareGuiField(QtWidgets.QPushButton):
         :param colour: False, 1-9
         :return: No value
         '''
-        COLOURS = {
-            1: "blue",
-            2: "green",
-            3: "red",
-            4: "navy",
-            5: "maroon",
-            6: "turqoise",
-            7: "purple",
-            8: "grey"
-        }
-        style = """
-        QPushButton {
-              width: 20px; height: 20px;
-              border: 0.5px solid;
-              border-color: rgb(117, 117, 117);
-              font-size:16pt;
-              font-weight: bold;
-              background-color: rgb(200, 200, 200);
-        """
-        if colour is False:
-            # Flatten the button, no text colour
-            self.setStyleSheet(f"{style} }}")
-        else:
-            # Flatten the button and set text colour
-            self.setStyleSheet(f"{style} color: {COLOURS[colour]} }}")
+        self.set_style("flat", colour or 0)
 
     # Set and get text.
     @property
@@ -86,5 +128,8 @@ class SquareGuiField(QtWidgets.QPushButton):
             t = "💣"
         elif t is "f":
             t = "🚩"
+        # Guard: Setting the same text still relayouts the button
+        if t == self.__text:
+            return
         self.__text = t
         self.setText(t)